@@ -1,14 +1,64 @@
 import os
+import re
+import ast
+import math
+import tokenize
+import zlib
+import tarfile
+import zipfile
+import base64
+import fcntl
 import json
-import subprocess
+import io
+import shutil
+import tempfile
+import contextlib
+import itertools
+import hashlib
+import sqlite3
+import threading
+import importlib.metadata
+from collections import OrderedDict, Counter
+import difflib
+import time
+import uuid
+import signal
+import queue
+import datetime
+import gc
+import multiprocessing
+import click
 import requests
+import git
 import google.generativeai as genai
-from flask import Flask, request, jsonify, redirect
+from flask import Flask, request, jsonify, redirect, Response
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, logout_user, current_user, login_required
 from flask_migrate import Migrate
 from werkzeug.security import generate_password_hash, check_password_hash
+from pylint.lint import Run as PylintRun
+from pylint.reporters import JSONReporter
+from astroid import MANAGER as ASTROID_MANAGER, modutils as astroid_modutils, nodes as astroid_nodes
+from bandit.core import config as bandit_config, docs_utils as bandit_docs, manager as bandit_manager
+from sqlalchemy.exc import IntegrityError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Private pylint/astroid caches cleared between uploads (see
+# release_workspace_modules). They move between releases, so a missing one
+# only costs the targeted clear, never startup.
+try:
+    from pylint.checkers.clear_lru_cache import clear_lru_caches as clear_pylint_caches
+except ImportError:
+    clear_pylint_caches = None
+try:
+    from astroid.interpreter._import import spec as astroid_spec
+except ImportError:
+    astroid_spec = None
 
 # --- App Configuration ---
 app = Flask(__name__)
@@ -49,11 +99,91 @@ class User(UserMixin, db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+class ReportBlob(db.Model):
+    digest = db.Column(db.String(64), primary_key=True)
+    codec = db.Column(db.String(10), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+
 class Report(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    content = db.Column(db.Text, nullable=False)
+    blob_digest = db.Column(db.String(64), db.ForeignKey('report_blob.digest'), nullable=False, index=True)
     timestamp = db.Column(db.DateTime, server_default=db.func.now())
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    # Summary columns, filled in at save time for the report listing.
+    pylint_errors = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    pylint_warnings = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    pylint_refactors = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    pylint_conventions = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    bandit_high = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    bandit_medium = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    bandit_low = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    max_complexity = db.Column(db.Integer, nullable=True)
+    # Reports of one repository form a history: a snapshot holds the whole
+    # report, any other report the delta from the previous one.
+    repository = db.Column(db.String(200), nullable=True)
+    previous_report_id = db.Column(db.Integer, db.ForeignKey('report.id'), nullable=True)
+    is_snapshot = db.Column(db.Boolean, nullable=False, default=True, server_default=db.true())
+    delta_depth = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    findings = db.relationship('Finding', backref='report', lazy=True, cascade='all, delete-orphan')
+    function_metrics = db.relationship('FunctionMetric', backref='report', lazy=True, cascade='all, delete-orphan')
+    blob = db.relationship('ReportBlob', lazy=True)
+    # SQLite appends the rowid to every index, so this also orders by id.
+    __table_args__ = (
+        db.Index('ix_report_user_id_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_report_user_id_repository_timestamp', 'user_id', 'repository', 'timestamp'),
+    )
+
+    @property
+    def content(self):
+        return json.dumps(load_report_data(self))
+
+# One row per pylint message or bandit issue of a saved report. `symbol` is
+# the pylint symbol or the bandit test id, `severity` the pylint message type
+# or the bandit issue severity.
+class Finding(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    report_id = db.Column(db.Integer, db.ForeignKey('report.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    tool = db.Column(db.String(20), nullable=False)
+    file_path = db.Column(db.String(500), nullable=False)
+    line = db.Column(db.Integer, nullable=True)
+    symbol = db.Column(db.String(100), nullable=True)
+    message_id = db.Column(db.String(20), nullable=True)
+    severity = db.Column(db.String(20), nullable=True)
+    confidence = db.Column(db.String(20), nullable=True)
+    message = db.Column(db.Text, nullable=True)
+    __table_args__ = (
+        db.Index('ix_finding_report_id_tool', 'report_id', 'tool'),
+        db.Index('ix_finding_user_id_tool_symbol', 'user_id', 'tool', 'symbol'),
+    )
+
+# One row per function, method or class block of a saved report's metrics.
+class FunctionMetric(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    report_id = db.Column(db.Integer, db.ForeignKey('report.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    file_path = db.Column(db.String(500), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)
+    name = db.Column(db.String(200), nullable=False)
+    classname = db.Column(db.String(200), nullable=True)
+    line = db.Column(db.Integer, nullable=True)
+    complexity = db.Column(db.Integer, nullable=False)
+    rank = db.Column(db.String(1), nullable=False)
+    __table_args__ = (
+        db.Index('ix_function_metric_report_id_complexity', 'report_id', 'complexity'),
+    )
+
+class AnalysisJob(db.Model):
+    id = db.Column(db.String(36), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)
+    payload = db.Column(db.Text, nullable=False)
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -144,71 +274,2180 @@ def get_repos():
     repos_json = repos_res.json()
     return jsonify([{"name": repo['full_name']} for repo in repos_json])
 
-# --- Analysis from Uploaded Files ---
-@app.route('/analyze', methods=['POST'])
-def analyze_code():
-    files = request.get_json()
-    if not files or not isinstance(files, list):
-        return jsonify({"error": "No files provided"}), 400
+# --- Analysis Artifacts ---
+# The first stage of every analysis normalizes each file once and derives its
+# content hash, AST or syntax error, token stream and line index. The cache,
+# the metrics engine and the import scan of incremental runs all read these
+# artifacts instead of parsing the source again. A file that does not parse
+# skips every tool and is reported once, in pylint's syntax-error format:
+# among pylint's findings, or, when pylint is not run, in the final event,
+# which counts unparsable files whichever tools ran.
+SYNTAX_ERROR_TOOL = 'pylint'
 
-    if len(files) > 20 or any(len(f['content']) > 10000 for f in files):
-        return jsonify({"error": "Too many or too large files."}), 400
+def normalize_source(content):
+    return content.replace('\r\n', '\n').replace('\r', '\n')
 
-    file_paths_to_analyze = []
-    for file_info in files:
-        file_path = os.path.join(UPLOAD_FOLDER, file_info['fileName'])
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(file_info['content'])
-        file_paths_to_analyze.append(file_path)
+def source_digest(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def syntax_error_finding(file_name, error):
+    if isinstance(error, SyntaxError):
+        message, line, column = error.msg, error.lineno or 1, max((error.offset or 1) - 1, 0)
+    elif isinstance(error, tokenize.TokenError):
+        message, (line, column) = error.args[0], error.args[1]
+    else:
+        message, line, column = str(error), 1, 0
+    module = module_name(file_name)
+    return {
+        "type": "error",
+        "module": module,
+        "obj": "",
+        "line": line,
+        "column": column,
+        "endLine": None,
+        "endColumn": None,
+        "path": file_name,
+        "symbol": "syntax-error",
+        "message": f"Parsing failed: '{message} ({module}, line {line})'",
+        "message-id": "E0001",
+    }
 
-    # --- Pylint ---
+def unparsable_fields(syntax_errors, tools):
+    fields = {"unparsable": len(syntax_errors)}
+    if SYNTAX_ERROR_TOOL not in tools:
+        fields['syntax_errors'] = syntax_errors
+    return fields
+
+def build_artifacts(file_name, content):
+    content = normalize_source(content)
+    artifacts = {
+        'file_name': file_name,
+        'content': content,
+        'digest': source_digest(content),
+        'lines': content.splitlines(),
+        'tree': None,
+        'tokens': None,
+        'syntax_error': None,
+    }
     try:
-        pylint_proc = subprocess.run(
-            ['pylint'] + file_paths_to_analyze + ['--output-format=json'],
-            capture_output=True, text=True, timeout=30
-        )
-        pylint_results = json.loads(pylint_proc.stdout) if pylint_proc.stdout else []
-    except Exception:
-        pylint_results = [{"message": "Pylint analysis failed", "type": "fatal"}]
+        artifacts['tree'] = ast.parse(content, filename=file_name)
+        artifacts['tokens'] = list(tokenize.generate_tokens(io.StringIO(content).readline))
+    except (SyntaxError, ValueError, tokenize.TokenError) as e:
+        artifacts['tree'] = None
+        artifacts['syntax_error'] = syntax_error_finding(file_name, e)
+    return artifacts
+
+# --- Code Metrics Engine ---
+# Cyclomatic complexity, maintainability index, raw line counts and Halstead
+# metrics for a file come from its token stream and one walk over its AST.
+# Scores follow radon's definitions, so the 'radon' payload keeps its blocks
+# and gains a per-file 'module' entry.
+METRICS_ENGINE_VERSION = '1'
+
+RAW_METRIC_KEYS = ['loc', 'lloc', 'sloc', 'comments', 'multi', 'blank', 'single_comments']
+HALSTEAD_OPERAND_FIELDS = {ast.Name: 'id', ast.Attribute: 'attr', ast.Constant: 'value'}
+LAYOUT_TOKENS = {tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER}
+
+def complexity_rank(score):
+    return chr(min(int(math.ceil(score / 10.0) or 1) - (1, 0)[5 - score < 0], 5) + 65)
+
+def maintainability_rank(score):
+    return chr(65 + (9 - score >= 0) + (19 - score >= 0))
+
+def logical_lines(tokens):
+    count = 0
+    statement = []
+    for token in tokens + [None]:
+        if token is not None and not (token.type == tokenize.OP and token.string == ';'):
+            if token.type != tokenize.COMMENT:
+                statement.append(token)
+            continue
+        colons = [i for i, t in enumerate(statement) if t.type == tokenize.OP and t.string == ':']
+        if colons:
+            # "if x: return y" is two logical lines, "if x:" only one.
+            count += 1 if colons[-1] == len(statement) - 1 else 2
+        elif statement:
+            count += 1
+        statement = []
+    return count
+
+def raw_metrics(lines, tokens):
+    lines = [line.strip() for line in lines]
+    raw = dict.fromkeys(RAW_METRIC_KEYS, 0)
+    raw['blank'] = lines.count('')
+    depth = 0
+    statement = []
+    for token in tokens:
+        if token.type == tokenize.OP:
+            if token.string in ('(', '[', '{'):
+                depth += 1
+            elif token.string in (')', ']', '}'):
+                depth -= 1
+        elif token.type == tokenize.COMMENT:
+            raw['comments'] += 1
+        if token.type not in LAYOUT_TOKENS:
+            statement.append(token)
+            continue
+        if not statement or (token.type == tokenize.NL and depth):
+            continue
+        raw['lloc'] += logical_lines(statement)
+        if len(statement) == 1 and statement[0].type == tokenize.COMMENT:
+            raw['single_comments'] += 1
+        elif len(statement) == 1 and statement[0].type == tokenize.STRING:
+            # A statement that is only a string is treated as a docstring.
+            first, last = statement[0].start[0], statement[0].end[0]
+            if first == last:
+                raw['single_comments'] += 1
+            else:
+                raw['multi'] += sum(1 for line in lines[first - 1:last] if line)
+        statement = []
+    raw['sloc'] = len(lines) - raw['blank'] - raw['multi'] - raw['single_comments']
+    raw['loc'] = len(lines)
+    return raw
+
+class MetricsVisitor(ast.NodeVisitor):
+    # Complexity is collected per scope: the module, each class and each
+    # function own the decision points in their body, and nested functions are
+    # scored on their own. Halstead operators and operands are counted over the
+    # whole file in the same walk.
+    def __init__(self):
+        self.module = {'decisions': 0, 'functions': [], 'classes': [], 'kind': 'module'}
+        self.scope = self.module
+        self.context = None
+        self.counting = True
+        self.operators = 0
+        self.operands = 0
+        self.operators_seen = set()
+        self.operands_seen = set()
+
+    def decision(self, points):
+        if self.counting:
+            self.scope['decisions'] += points
+
+    def count_halstead(self, operators, operands):
+        self.operators += len(operators)
+        self.operands += len(operands)
+        self.operators_seen.update(type(op).__name__ for op in operators)
+        for operand in operands:
+            field = HALSTEAD_OPERAND_FIELDS.get(type(operand))
+            self.operands_seen.add((self.context, getattr(operand, field) if field else operand))
+
+    def visit_If(self, node):
+        self.decision(1)
+        self.generic_visit(node)
+
+    visit_IfExp = visit_If
+
+    def visit_For(self, node):
+        self.decision(bool(node.orelse) + 1)
+        self.generic_visit(node)
+
+    visit_AsyncFor = visit_While = visit_For
+
+    def visit_Try(self, node):
+        self.decision(len(node.handlers) + bool(node.orelse))
+        self.generic_visit(node)
+
+    def visit_Match(self, node):
+        wildcard = any(getattr(case.pattern, 'pattern', False) is None for case in node.cases)
+        self.decision(max(0, len(node.cases) - wildcard))
+        self.generic_visit(node)
+
+    def visit_comprehension(self, node):
+        self.decision(len(node.ifs) + 1)
+        self.generic_visit(node)
+
+    def visit_Assert(self, node):
+        # An assertion is one branch; its condition is not scored further.
+        self.decision(1)
+        counting, self.counting = self.counting, False
+        self.generic_visit(node)
+        self.counting = counting
+
+    def visit_BoolOp(self, node):
+        self.decision(len(node.values) - 1)
+        self.count_halstead([node.op], node.values)
+        self.generic_visit(node)
+
+    def visit_BinOp(self, node):
+        self.count_halstead([node.op], [node.left, node.right])
+        self.generic_visit(node)
 
-    # --- Bandit ---
+    def visit_UnaryOp(self, node):
+        self.count_halstead([node.op], [node.operand])
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node):
+        self.count_halstead([node.op], [node.target, node.value])
+        self.generic_visit(node)
+
+    def visit_Compare(self, node):
+        self.count_halstead(node.ops, node.comparators + [node.left])
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node):
+        # Decorators and argument defaults belong to neither the function nor
+        # its parent, so only the body is walked.
+        function = {
+            'name': node.name, 'lineno': node.lineno, 'col_offset': node.col_offset,
+            'endline': node.end_lineno, 'decisions': 0, 'functions': [], 'classes': [],
+            'kind': 'function', 'classname': self.scope['name'] if self.scope['kind'] == 'class' else None,
+        }
+        self.scope['functions'].append(function)
+        parent, context, counting = self.scope, self.context, self.counting
+        self.scope, self.context, self.counting = function, node.name, True
+        for statement in node.body:
+            self.visit(statement)
+        self.scope, self.context, self.counting = parent, context, counting
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node):
+        cls = {
+            'name': node.name, 'lineno': node.lineno, 'col_offset': node.col_offset,
+            'endline': node.end_lineno, 'decisions': 0, 'functions': [], 'classes': [],
+            'kind': 'class',
+        }
+        self.scope['classes'].append(cls)
+        parent, counting = self.scope, self.counting
+        self.counting = False
+        for child in node.bases + node.keywords + node.decorator_list:
+            self.visit(child)
+        self.scope, self.counting = cls, True
+        for statement in node.body:
+            self.visit(statement)
+        self.scope, self.counting = parent, counting
+
+    def halstead_report(self):
+        h1, h2 = len(self.operators_seen), len(self.operands_seen)
+        n1, n2 = self.operators, self.operands
+        vocabulary, length = h1 + h2, n1 + n2
+        volume = length * math.log(vocabulary, 2) if vocabulary else 0
+        difficulty = h1 * n2 / (2 * h2) if h2 else 0
+        effort = difficulty * volume
+        return {
+            'h1': h1, 'h2': h2, 'N1': n1, 'N2': n2,
+            'vocabulary': vocabulary, 'length': length,
+            'calculated_length': h1 * math.log(h1, 2) + h2 * math.log(h2, 2) if h1 and h2 else 0,
+            'volume': volume, 'difficulty': difficulty, 'effort': effort,
+            'time': effort / 18.0, 'bugs': volume / 3000.0,
+        }
+
+def function_complexity(function):
+    return 1 + function['decisions']
+
+def class_complexity(cls):
+    return 1 + cls['decisions'] + sum(function_complexity(method) for method in cls['functions'])
+
+def function_block(function):
+    complexity = function_complexity(function)
+    block = {
+        'type': 'method' if function['classname'] else 'function',
+        'rank': complexity_rank(complexity), 'name': function['name'],
+        'lineno': function['lineno'], 'col_offset': function['col_offset'],
+        'endline': function['endline'], 'complexity': complexity,
+        'closures': [function_block(closure) for closure in function['functions']],
+    }
+    if function['classname']:
+        block['classname'] = function['classname']
+    return block
+
+def class_block(cls):
+    methods = cls['functions']
+    # A class scores the average of its methods, plus one when it has several.
+    complexity = class_complexity(cls)
+    if methods:
+        complexity = int(complexity / len(methods)) + (len(methods) > 1)
+    return {
+        'type': 'class', 'rank': complexity_rank(complexity), 'name': cls['name'],
+        'lineno': cls['lineno'], 'col_offset': cls['col_offset'],
+        'endline': cls['endline'], 'complexity': complexity,
+        'methods': [function_block(method) for method in methods],
+    }
+
+def maintainability_index(volume, complexity, lloc, comment_percent):
+    if volume <= 0 or lloc <= 0:
+        return 100.0
+    score = (171 - 5.2 * math.log(volume) - 0.23 * complexity - 16.2 * math.log(lloc)
+             + 50 * math.sin(math.sqrt(2.46 * math.radians(comment_percent))))
+    return min(max(0.0, score * 100 / 171.0), 100.0)
+
+def measure_artifacts(artifacts):
+    raw = raw_metrics(artifacts['lines'], artifacts['tokens'])
+    visitor = MetricsVisitor()
+    visitor.visit(artifacts['tree'])
+    module = visitor.module
+
+    blocks = [function_block(function) for function in module['functions']]
+    for cls in module['classes']:
+        blocks.append(class_block(cls))
+        blocks.extend(function_block(method) for method in cls['functions'])
+    blocks.sort(key=lambda block: -block['complexity'])
+
+    total_complexity = (1 + module['decisions']
+                        + sum(function_complexity(f) - 1 for f in module['functions'])
+                        + sum(class_complexity(c) - 1 for c in module['classes']))
+    halstead = visitor.halstead_report()
+    comment_percent = (raw['comments'] + raw['multi']) / raw['sloc'] * 100 if raw['sloc'] else 0
+    mi = maintainability_index(halstead['volume'], total_complexity, raw['lloc'], comment_percent)
+    blocks.append({
+        'type': 'module', 'name': '<module>',
+        'complexity': total_complexity, 'rank': complexity_rank(total_complexity),
+        'mi': mi, 'mi_rank': maintainability_rank(mi),
+        'raw': raw, 'halstead': halstead,
+    })
+    for block in blocks:
+        block['file_path'] = artifacts['file_name']
+    return blocks
+
+# --- Analysis Tools ---
+# The tools run through their Python APIs inside a pool of long-lived worker
+# processes, so /analyze no longer pays an interpreter start and the
+# pylint/astroid import on every call. A cold pylint run mostly parses the
+# stdlib and third-party modules the upload imports, so the modules in
+# ANALYZER_WARMUP_MODULES, and those they import from their own package, are
+# parsed once before the pool is forked and shared by every worker. Each web
+# process forks a pool of its own, so with several web processes (gunicorn
+# workers) ANALYZER_POOL_SIZE should divide the CPUs between them; the
+# admission limit below already counts analyses across all of them.
+ANALYZER_POOL_SIZE = int(os.environ.get('ANALYZER_POOL_SIZE', os.cpu_count() or 2))
+ANALYZER_MAX_TASKS_PER_CHILD = int(os.environ.get('ANALYZER_MAX_TASKS_PER_CHILD', 50))
+ANALYZER_WARMUP_MODULES = [name for name in os.environ.get('ANALYZER_WARMUP_MODULES', ','.join([
+    'abc', 'argparse', 'ast', 'asyncio', 'collections', 'contextlib', 'csv', 'dataclasses', 'datetime', 'decimal',
+    'enum', 'functools', 'hashlib', 'inspect', 'io', 'itertools', 'json', 'logging', 'math', 'os', 'pathlib',
+    'random', 're', 'shutil', 'sqlite3', 'string', 'subprocess', 'sys', 'tempfile', 'threading', 'time',
+    'traceback', 'types', 'typing', 'typing_extensions', 'unittest', 'uuid',
+    'flask', 'werkzeug', 'sqlalchemy', 'requests',
+])).split(',') if name]
+ANALYZER_CANCEL_SLOTS = 256
+ANALYZER_CANCEL_POLL_INTERVAL = 0.05
+ANALYZER_TIMEOUT = 30
+
+# --- Analysis Deadlines ---
+# Every request gets one deadline, ANALYSIS_DEADLINE seconds after it starts.
+# Fetching a repository may use up to ANALYSIS_FETCH_SHARE of it and the
+# analysis gets whatever is left, further capped per tool by the profile
+# budgets below. Tools still running at their deadline are killed and report
+# the findings of the shards that did finish, so a request never runs much
+# past the deadline.
+ANALYSIS_DEADLINE = float(os.environ.get('ANALYSIS_DEADLINE', 60))
+ANALYSIS_FETCH_SHARE = float(os.environ.get('ANALYSIS_FETCH_SHARE', 0.5))
+
+# --- Analysis Profiles ---
+# A profile picks the pylint checkers and inference depth, a time budget per
+# tool and, for the interactive tier, early termination:
+#   fast      pylint error and fatal checks only, with shallow inference.
+#             Stops after ANALYSIS_FAST_MAX_FINDINGS findings per tool or at
+#             the first fatal message. Latency target: an /analyze upload at
+#             the request limits (20 files) answers within 2 seconds on a warm
+#             pool; bench_fast_profile.py checks it.
+#   standard  pylint defaults except the cross-module duplicate-code and
+#             cyclic-import checks, which need a pass over all files.
+#   full      the audit tier: pylint defaults with the full budget. Saved
+#             reports should come from this tier, which is also the default.
+#             The cross-module checks run once over all files, next to the
+#             sharded runs that leave them out.
+ANALYSIS_FAST_MAX_FINDINGS = int(os.environ.get('ANALYSIS_FAST_MAX_FINDINGS', 200))
+ANALYSIS_DEFAULT_PROFILE = os.environ.get('ANALYSIS_DEFAULT_PROFILE', 'full')
+
+ANALYSIS_PROFILES = {
+    'fast': {
+        'tool_args': {'pylint': ['--disable=all', '--enable=E,F', '--limit-inference-results=10']},
+        'budgets': {'pylint': 5, 'bandit': 5, 'radon': 5},
+        'max_findings': ANALYSIS_FAST_MAX_FINDINGS,
+        'stop_on_fatal': True,
+        'cross_file_checks': False,
+    },
+    'standard': {
+        'tool_args': {'pylint': ['--disable=duplicate-code,cyclic-import', '--limit-inference-results=25']},
+        'budgets': {'pylint': 15, 'bandit': 10, 'radon': 10},
+        'max_findings': None,
+        'stop_on_fatal': False,
+        'cross_file_checks': False,
+    },
+    'full': {
+        'tool_args': {'pylint': []},
+        'budgets': {'pylint': ANALYZER_TIMEOUT, 'bandit': ANALYZER_TIMEOUT, 'radon': ANALYZER_TIMEOUT},
+        'max_findings': None,
+        'stop_on_fatal': False,
+        'cross_file_checks': True,
+    },
+}
+
+# pylint checks that compare modules with each other. A shard only sees its
+# own files, so where a profile runs them they are left out of the sharded
+# runs and run once over every file instead.
+CROSS_FILE_PYLINT_CHECKS = ('duplicate-code', 'cyclic-import')
+
+# Early termination only applies to tools that report findings, not metrics.
+EARLY_STOP_TOOLS = ('pylint', 'bandit')
+
+# Pool tools, cheapest first. bandit finishes a shard in a fraction of the
+# time pylint takes, so its shards are queued ahead of pylint's.
+POOL_TOOL_ORDER = ('bandit', 'pylint')
+
+FAILED_ANALYSIS = {
+    'pylint': [{"message": "Pylint analysis failed", "type": "fatal"}],
+    'bandit': [{"issue_text": "Bandit analysis failed"}],
+    'radon': [{"name": "Radon analysis failed", "complexity": 0}],
+}
+
+class PylintStopped(BaseException):
+    # pylint turns an Exception raised while checking a module into an
+    # astroid-error message and carries on, so this has to bypass it.
+    pass
+
+class BoundedJSONReporter(JSONReporter):
+    def __init__(self, output, max_findings=None, stop_on_fatal=False):
+        super().__init__(output)
+        self.max_findings = max_findings
+        self.stop_on_fatal = stop_on_fatal
+
+    def handle_message(self, msg):
+        super().handle_message(msg)
+        if (self.max_findings and len(self.messages) >= self.max_findings) \
+                or (self.stop_on_fatal and msg.category == 'fatal'):
+            raise PylintStopped()
+
+def release_workspace_modules():
+    # astroid caches modules by name, so a workspace module left in its cache
+    # would be served for the next upload that reuses the name. Only those
+    # modules and the cheap path lookups are dropped; the stdlib and
+    # third-party modules they imported stay parsed on this long-lived worker.
+    # The lookups are private to astroid; if a release renames one, the
+    # public full reset is used instead, which re-parses everything but
+    # never serves a stale workspace module.
+    if clear_pylint_caches is not None:
+        clear_pylint_caches()
+    for name, module in list(ASTROID_MANAGER.astroid_cache.items()):
+        if module.file and module.file.startswith(WORKSPACE_ROOT + os.sep):
+            del ASTROID_MANAGER.astroid_cache[name]
     try:
-        bandit_proc = subprocess.run(
-            ['bandit', '-r', UPLOAD_FOLDER, '-f', 'json'],
-            capture_output=True, text=True, timeout=30
-        )
-        bandit_results = json.loads(bandit_proc.stdout).get("results", [])
+        ASTROID_MANAGER._mod_file_cache.clear()
+        for lookup in (astroid_spec._find_spec, astroid_spec._is_setuptools_namespace,
+                       astroid_modutils._cache_normalize_path_, astroid_modutils._has_init,
+                       astroid_modutils.cached_os_path_isfile):
+            lookup.cache_clear()
+        for finder in astroid_spec._SPEC_FINDERS:
+            finder.find_module.cache_clear()
+    except AttributeError:
+        ASTROID_MANAGER.clear_cache()
+
+def warm_analyzer_modules(module_names):
+    # Only module-level imports are followed, and only within the package
+    # they were found in, so the walk covers what importing it would load.
+    pending = list(module_names)
+    seen = set()
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        try:
+            module = ASTROID_MANAGER.ast_from_module_name(name)
+            imported = []
+            for node in module.body:
+                if isinstance(node, astroid_nodes.Import):
+                    imported.extend(imported_name for imported_name, _ in node.names)
+                elif isinstance(node, astroid_nodes.ImportFrom):
+                    base = module.relative_to_absolute_name(node.modname, node.level)
+                    imported.append(base)
+                    imported.extend(f"{base}.{imported_name}" for imported_name, _ in node.names if imported_name != '*')
+        except Exception:
+            continue
+        package = name.split('.')[0]
+        pending.extend(imported_name for imported_name in imported if imported_name.split('.')[0] == package)
+
+def run_pylint(file_paths, profile, cross_file=False):
+    settings = ANALYSIS_PROFILES[profile]
+    args = list(settings['tool_args']['pylint'])
+    if cross_file:
+        args += ['--disable=all', f"--enable={','.join(CROSS_FILE_PYLINT_CHECKS)}"]
+    elif settings['cross_file_checks']:
+        args.append(f"--disable={','.join(CROSS_FILE_PYLINT_CHECKS)}")
+    reporter = BoundedJSONReporter(io.StringIO(), settings['max_findings'], settings['stop_on_fatal'])
+    try:
+        PylintRun(file_paths + args, reporter=reporter, exit=False)
+    except PylintStopped:
+        pass
     except Exception:
-        bandit_results = [{"issue_text": "Bandit analysis failed"}]
+        return FAILED_ANALYSIS['pylint']
+    finally:
+        release_workspace_modules()
+    return [JSONReporter.serialize(message) for message in reporter.messages]
 
-    # --- Radon ---
-    radon_results = []
+def run_bandit(file_paths, profile):
     try:
-        radon_proc = subprocess.run(
-            ['radon', 'cc'] + file_paths_to_analyze + ['-j'],
-            capture_output=True, text=True, timeout=30
-        )
-        raw = json.loads(radon_proc.stdout)
-        for file_path, funcs in raw.items():
-            for func in funcs:
-                func['file_path'] = os.path.basename(file_path)
-                radon_results.append(func)
+        manager = bandit_manager.BanditManager(bandit_config.BanditConfig(), 'file')
+        manager.discover_files(file_paths, recursive=True)
+        manager.run_tests()
+        results = [issue.as_dict() for issue in manager.get_issue_list()]
+        for issue in results:
+            issue['more_info'] = bandit_docs.get_url(issue['test_id'])
+        return sorted(results, key=lambda issue: issue['filename'])
     except Exception:
-        radon_results = [{"name": "Radon analysis failed", "complexity": 0}]
+        return FAILED_ANALYSIS['bandit']
 
-    # --- Cleanup ---
-    for path in file_paths_to_analyze:
+def run_metrics(file_artifacts, profile):
+    metrics_results = []
+    for artifacts in file_artifacts:
+        # A file the engine trips over contributes no blocks instead of
+        # failing the whole run.
         try:
-            os.remove(path)
+            metrics_results.extend(measure_artifacts(artifacts))
         except Exception:
+            continue
+    return metrics_results
+
+ANALYZERS = {
+    'pylint': run_pylint,
+    'bandit': run_bandit,
+    'radon': run_metrics,
+}
+
+# These run in the calling process on the shared artifacts rather than on
+# workspace paths in the pool, so their findings already carry file names.
+ARTIFACT_ANALYZERS = {'radon'}
+
+def run_analyzer(tool, target, profile, task_id=None, deadline=None, options=None):
+    start = time.perf_counter()
+    if task_id is None:
+        results = ANALYZERS[tool](target, profile, **(options or {}))
+    else:
+        # A task that only gets a worker after its request gave up on it is
+        # skipped, as is one whose process was killed at the deadline.
+        if (deadline is not None and time.monotonic() >= deadline) or analyzer_task_cancelled(task_id):
+            return None
+        results = run_task_process(task_id, deadline, (tool, target, profile, options))
+        if results is None:
+            return None
+    return results, round(time.perf_counter() - start, 3)
+
+def run_task_process(task_id, deadline, request):
+    # The tool runs in a task process forked from this worker and leading its
+    # own session. It lives as long as the worker and keeps astroid's parse
+    # cache warm between tasks, but the worker kills it, with anything it
+    # spawned, once the task is past its deadline or settled without it, and
+    # forks a fresh one from its own warm state for the next task. Only this
+    # worker ever kills it, and only while it runs this task.
+    global analyzer_task_process
+    if analyzer_task_process is None:
+        analyzer_task_process = start_task_process()
+    pid, connection = analyzer_task_process
+    try:
+        connection.send(request)
+        while not connection.poll(ANALYZER_CANCEL_POLL_INTERVAL):
+            if (deadline is not None and time.monotonic() >= deadline) or analyzer_task_cancelled(task_id):
+                stop_task_process()
+                return None
+        succeeded, value = connection.recv()
+    except (EOFError, OSError):
+        stop_task_process()
+        raise RuntimeError("The analyzer process exited unexpectedly")
+    if not succeeded:
+        raise RuntimeError(value)
+    return value
+
+def start_task_process():
+    worker_end, task_end = multiprocessing.Pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            worker_end.close()
+            os.setsid()
+            serve_task_process(task_end)
+        finally:
+            os._exit(0)
+    task_end.close()
+    return pid, worker_end
+
+def serve_task_process(connection):
+    # Runs until its worker exits, which closes the other end of the pipe.
+    while True:
+        try:
+            tool, target, profile, options = connection.recv()
+        except EOFError:
+            return
+        try:
+            outcome = (True, ANALYZERS[tool](target, profile, **(options or {})))
+        except Exception as e:
+            outcome = (False, str(e))
+        connection.send(outcome)
+
+def stop_task_process():
+    global analyzer_task_process
+    pid, connection = analyzer_task_process
+    analyzer_task_process = None
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    connection.close()
+    os.waitpid(pid, 0)
+
+def analyzer_task_cancelled(task_id):
+    with analyzer_task_cancels.get_lock():
+        return task_id in analyzer_task_cancels[:]
+
+def init_analyzer_worker(task_cancels):
+    global analyzer_task_cancels
+    analyzer_task_cancels = task_cancels
+
+def create_analyzer_pool():
+    # Workers are forked from this process, so they inherit the analyzer
+    # imports and the warmed astroid modules above instead of building them
+    # again.
+    context = multiprocessing.get_context('fork')
+    task_cancels = context.Array('q', ANALYZER_CANCEL_SLOTS)
+    pool = context.Pool(
+        processes=ANALYZER_POOL_SIZE, maxtasksperchild=ANALYZER_MAX_TASKS_PER_CHILD,
+        initializer=init_analyzer_worker, initargs=(task_cancels,)
+    )
+    return pool, task_cancels
+
+analyzer_pool = None
+analyzer_pool_pid = None
+analyzer_task_process = None
+analyzer_task_cancels = None
+analyzer_task_cancel_count = 0
+analyzer_task_ids = itertools.count(1)
+
+def get_analyzer_pool():
+    global analyzer_pool, analyzer_pool_pid, analyzer_task_cancels
+    if analyzer_pool is None or analyzer_pool_pid != os.getpid():
+        analyzer_pool, analyzer_task_cancels = create_analyzer_pool()
+        analyzer_pool_pid = os.getpid()
+    return analyzer_pool
+
+def settle_analyzer_tasks(task_ids, finished):
+    # Publishes a tool's unfinished tasks as cancelled. The worker running
+    # one of them notices within ANALYZER_CANCEL_POLL_INTERVAL and kills its
+    # task process; one still queued is skipped when it reaches a worker. The
+    # cancelled ids go round a fixed ring, so a task whose slot is reused
+    # before it is noticed still stops at its deadline.
+    global analyzer_task_cancel_count
+    with analyzer_task_cancels.get_lock():
+        for task_id in task_ids:
+            if task_id not in finished:
+                analyzer_task_cancels[analyzer_task_cancel_count % ANALYZER_CANCEL_SLOTS] = task_id
+                analyzer_task_cancel_count += 1
+
+# --- Analysis Workspaces ---
+# Every analysis gets a private directory, so bandit only scans the files of
+# the current request and concurrent uploads with the same name never clash.
+# The 'memory' backend keeps workspaces on a RAM-backed tmpfs so the hot path
+# writes nothing to persistent storage; 'disk' uses UPLOAD_FOLDER.
+ANALYSIS_WORKSPACE_BACKEND = os.environ.get('ANALYSIS_WORKSPACE_BACKEND', 'memory')
+ANALYSIS_TMPFS_ROOT = os.environ.get('ANALYSIS_TMPFS_ROOT', '/dev/shm')
+
+def get_workspace_root():
+    if ANALYSIS_WORKSPACE_BACKEND == 'memory' and os.path.isdir(ANALYSIS_TMPFS_ROOT) \
+            and os.access(ANALYSIS_TMPFS_ROOT, os.W_OK):
+        return ANALYSIS_TMPFS_ROOT
+    return UPLOAD_FOLDER
+
+WORKSPACE_ROOT = get_workspace_root()
+
+@contextlib.contextmanager
+def analysis_workspace():
+    workspace = tempfile.mkdtemp(prefix='analysis-', dir=WORKSPACE_ROOT)
+    try:
+        yield workspace
+    finally:
+        # The rename removes the workspace from view in one atomic step.
+        discarded = workspace + '.discarded'
+        os.rename(workspace, discarded)
+        shutil.rmtree(discarded, ignore_errors=True)
+
+def workspace_relative_path(file_name):
+    relative_path = os.path.normpath(file_name.replace('\\', '/').lstrip('/'))
+    if relative_path == '.' or relative_path.split(os.sep)[0] == '..':
+        raise ValueError(f"Invalid file name: {file_name}")
+    return relative_path
+
+def write_workspace_file(workspace, file_name, content):
+    file_path = os.path.join(workspace, workspace_relative_path(file_name))
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return file_path
+
+def read_workspace_files(workspace, file_names):
+    # Files are read back lazily, as the pipeline asks for them.
+    for file_name in file_names:
+        with open(os.path.join(workspace, file_name), encoding='utf-8', newline='') as f:
+            yield {"fileName": file_name, "content": f.read()}
+
+FINDING_PATH_KEYS = {
+    'pylint': 'path',
+    'bandit': 'filename',
+    'radon': 'file_path',
+}
+
+def relativize_findings(workspace, tool, findings):
+    # Report paths as the client named them, not as workspace paths.
+    path_key = FINDING_PATH_KEYS[tool]
+    for finding in findings:
+        if path_key in finding:
+            finding[path_key] = os.path.relpath(finding[path_key], workspace)
+
+# --- Analysis Result Cache ---
+# Findings are cached per file, keyed by the content hash together with the
+# tool, its version and the options it runs with, so re-uploading unchanged
+# modules never reaches an analyzer. A small in-memory LRU sits in front of a
+# SQLite store that is capped by size.
+ANALYSIS_CACHE_PATH = os.environ.get('ANALYSIS_CACHE_PATH', os.path.join(app.instance_path, 'analysis_cache.db'))
+ANALYSIS_CACHE_MEMORY_ENTRIES = int(os.environ.get('ANALYSIS_CACHE_MEMORY_ENTRIES', 4096))
+ANALYSIS_CACHE_MAX_BYTES = int(os.environ.get('ANALYSIS_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+TOOL_CONFIGS = {
+    'pylint': ['json'],
+    'bandit': ['default'],
+    'radon': ['cc', 'mi', 'raw', 'hal'],
+}
+
+TOOL_VERSIONS = {
+    'pylint': importlib.metadata.version('pylint'),
+    'bandit': importlib.metadata.version('bandit'),
+    # radon findings come from the in-process metrics engine
+    'radon': f"metrics-{METRICS_ENGINE_VERSION}",
+}
+
+# Per-file findings only depend on a profile through the tool options it sets,
+# so tools a profile leaves alone share cache entries across profiles.
+TOOL_FINGERPRINTS = {
+    profile: {
+        tool: f"{tool}=={TOOL_VERSIONS[tool]};{' '.join(TOOL_CONFIGS[tool] + settings['tool_args'].get(tool, []))}"
+        for tool in ANALYZERS
+    }
+    for profile, settings in ANALYSIS_PROFILES.items()
+}
+
+class AnalysisCache:
+    def __init__(self, path, memory_entries, max_bytes):
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS findings ('
+            'key TEXT PRIMARY KEY, payload TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS ix_findings_last_used ON findings (last_used)')
+        self.conn.commit()
+
+    def get(self, key):
+        # Payloads are kept serialized so every hit hands out a fresh copy.
+        with self.lock:
+            payload = self.memory.get(key)
+            if payload is not None:
+                self.memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return json.loads(payload)
+            row = self.conn.execute('SELECT payload FROM findings WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            self.conn.execute('UPDATE findings SET last_used = ? WHERE key = ?', (time.time(), key))
+            self.conn.commit()
+            self.stats['disk_hits'] += 1
+            self._remember(key, row[0])
+            return json.loads(row[0])
+
+    def put_many(self, items):
+        with self.lock:
+            now = time.time()
+            for key, findings in items:
+                payload = json.dumps(findings)
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO findings (key, payload, size, last_used) VALUES (?, ?, ?, ?)',
+                    (key, payload, len(payload), now)
+                )
+                self._remember(key, payload)
+            self._evict()
+            self.conn.commit()
+
+    def _remember(self, key, payload):
+        self.memory[key] = payload
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _evict(self):
+        total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM findings').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute('SELECT key, size FROM findings ORDER BY last_used').fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes * 0.9:
+                break
+            self.conn.execute('DELETE FROM findings WHERE key = ?', (key,))
+            self.memory.pop(key, None)
+            total -= size
+            self.stats['evictions'] += 1
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats['memory_entries'] = len(self.memory)
+            stats['disk_bytes'] = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM findings').fetchone()[0]
+        return stats
+
+analysis_cache = AnalysisCache(ANALYSIS_CACHE_PATH, ANALYSIS_CACHE_MEMORY_ENTRIES, ANALYSIS_CACHE_MAX_BYTES)
+
+def cache_key(tool, digest, file_name, profile, dependencies=''):
+    # pylint derives module names and import resolution from the path, and
+    # infers through the workspace modules a file imports, so its findings
+    # are only reusable for the same file name and the same dependencies.
+    location = f"{file_name}:{dependencies}" if tool == 'pylint' else ''
+    return f"{TOOL_FINGERPRINTS[profile][tool]}:{location}:{digest}"
+
+def cross_file_cache_key(file_artifacts, profile):
+    # The cross-module checks depend on every file they ran over, and on the
+    # order: pylint reports them on the module it checked last.
+    pairs = [(artifacts['file_name'], artifacts['digest']) for artifacts in file_artifacts]
+    workspace = hashlib.sha256(json.dumps(pairs).encode()).hexdigest()
+    return f"{TOOL_FINGERPRINTS[profile]['pylint']}:cross-file:{workspace}"
+
+def pylint_dependency_digests(file_artifacts):
+    # Digest, per file, of every workspace module it reaches through imports,
+    # directly or not. An import is matched against each file's dotted name
+    # and its trailing parts, since pylint also resolves a module from its
+    # own directory; matching too much only costs cache hits.
+    file_artifacts = {artifacts['file_name']: artifacts for artifacts in file_artifacts}
+    by_module = {}
+    for file_name in file_artifacts:
+        parts = module_name(file_name).split('.')
+        for index in range(len(parts)):
+            if parts[index]:
+                by_module.setdefault('.'.join(parts[index:]), set()).add(file_name)
+    imports = {}
+    for file_name, artifacts in file_artifacts.items():
+        reached = set()
+        for imported in imported_modules(artifacts):
+            parts = imported.split('.')
+            for index in range(1, len(parts) + 1):
+                reached |= by_module.get('.'.join(parts[:index]), set())
+        imports[file_name] = reached
+    digests = {}
+    for file_name in file_artifacts:
+        seen, pending = set(), [file_name]
+        while pending:
+            for dependency in imports[pending.pop()] - seen:
+                seen.add(dependency)
+                pending.append(dependency)
+        seen.discard(file_name)
+        pairs = sorted((dependency, file_artifacts[dependency]['digest']) for dependency in seen)
+        digests[file_name] = hashlib.sha256(json.dumps(pairs).encode()).hexdigest()[:16]
+    return digests
+
+# --- Analysis Pipeline ---
+# Files that miss the cache are split into shards balanced by source size and
+# every (tool, shard) pair runs as its own pool task. Findings are regrouped
+# per file and emitted in upload order, so the merged output does not depend
+# on how the files were sharded.
+ANALYSIS_MAX_SHARDS = int(os.environ.get('ANALYSIS_MAX_SHARDS', ANALYZER_POOL_SIZE))
+
+def shard_files(file_names, weights, shard_count):
+    shards = [[] for _ in range(max(1, min(shard_count, len(file_names))))]
+    loads = [0] * len(shards)
+    for file_name in sorted(file_names, key=lambda name: -weights[name]):
+        lightest = loads.index(min(loads))
+        shards[lightest].append(file_name)
+        loads[lightest] += max(weights[file_name], 1)
+    order = {file_name: index for index, file_name in enumerate(file_names)}
+    return [sorted(shard, key=order.get) for shard in shards if shard]
+
+def merge_tool_findings(tool, sources, findings_by_file):
+    findings = [finding for file_name, _ in sources for finding in findings_by_file.get(file_name, [])]
+    if tool == 'bandit':
+        findings.sort(key=lambda issue: issue.get('filename', ''))
+    return findings
+
+def with_cross_file_findings(tool, findings_by_file, cross_file_findings):
+    if tool != 'pylint' or not cross_file_findings:
+        return findings_by_file
+    combined = dict(findings_by_file)
+    for finding in cross_file_findings:
+        combined[finding.get('path')] = combined.get(finding.get('path'), []) + [finding]
+    return combined
+
+def iter_analysis(files, refresh=(), context=(), artifacts=None, profile=ANALYSIS_DEFAULT_PROFILE, tools=None,
+                  deadline=None):
+    # Yields progress events and one 'result' event per tool as soon as all of
+    # that tool's shards are in, so callers can stream results incrementally.
+    # Files named in `refresh` bypass the cache; `context` files are written
+    # to the workspace for import resolution but not analyzed themselves.
+    # `artifacts` may hold artifacts the caller already built, by file name.
+    # Only the analyzers named in `tools` run; the default is all of them.
+    # Each tool stops at `deadline` or at its profile budget, whichever comes
+    # first, and reports a status of complete, partial, timed_out or failed.
+    settings = ANALYSIS_PROFILES[profile]
+    tools = [tool for tool in ANALYZERS if tools is None or tool in tools]
+    started = time.monotonic()
+    if deadline is None:
+        deadline = started + ANALYSIS_DEADLINE
+    deadlines = {tool: min(deadline, started + settings['budgets'][tool]) for tool in tools}
+    artifacts = dict(artifacts or {})
+    sources = []
+    for file_info in files:
+        file_name = workspace_relative_path(file_info['fileName'])
+        if file_name not in artifacts:
+            artifacts[file_name] = build_artifacts(file_name, file_info['content'])
+        sources.append((file_name, artifacts[file_name]['content']))
+    workspace_names = [file_name for file_name, _ in sources]
+    for file_info in context:
+        file_name = workspace_relative_path(file_info['fileName'])
+        if file_name not in artifacts:
+            artifacts[file_name] = build_artifacts(file_name, file_info['content'])
+        workspace_names.append(file_name)
+    dependencies = pylint_dependency_digests([artifacts[name] for name in workspace_names]) if 'pylint' in tools else {}
+    # Merged results list files in upload order, then any context file that
+    # only has cross-module findings.
+    ordering = [(file_name, None) for file_name in workspace_names]
+    findings_by_file = {tool: {} for tool in tools}
+    keys_by_file = {tool: {} for tool in tools}
+    syntax_errors = []
+    for file_name, _ in sources:
+        syntax_error = artifacts[file_name]['syntax_error']
+        if syntax_error is not None:
+            syntax_errors.append(dict(syntax_error))
+            for tool in tools:
+                findings_by_file[tool][file_name] = [dict(syntax_error)] if tool == SYNTAX_ERROR_TOOL else []
+            continue
+        for tool in tools:
+            key = cache_key(tool, artifacts[file_name]['digest'], file_name, profile, dependencies.get(file_name, ''))
+            cached = None if file_name in refresh else analysis_cache.get(key)
+            if cached is None:
+                keys_by_file[tool][file_name] = key
+                continue
+            for finding in cached:
+                finding[FINDING_PATH_KEYS[tool]] = file_name
+            findings_by_file[tool][file_name] = cached
+
+    # The cross-module pylint checks run over every parsable workspace file,
+    # once, and their findings are cached for that exact set of files. Files
+    # go in the order the caller built their artifacts, which for incremental
+    # runs is the repository order rather than re-analyzed files first.
+    in_workspace = set(workspace_names)
+    cross_file_names = [
+        name for name in artifacts if name in in_workspace and artifacts[name]['syntax_error'] is None
+    ]
+    cross_file_key = None
+    cross_file_findings = []
+    if 'pylint' in tools and settings['cross_file_checks'] and len(cross_file_names) > 1:
+        cross_file_key = cross_file_cache_key([artifacts[name] for name in cross_file_names], profile)
+        cached = analysis_cache.get(cross_file_key)
+        if cached is not None:
+            cross_file_key, cross_file_findings = None, cached
+
+    timings = {tool: 0.0 for tool in tools}
+    statuses = {tool: 'complete' for tool in tools}
+    yield {
+        "event": "progress",
+        "stage": "cache",
+        "profile": profile,
+        "files": len(sources),
+        "unparsable": len(syntax_errors),
+        "cached": {tool: len(sources) - len(syntax_errors) - len(keys_by_file[tool]) for tool in tools},
+    }
+    for tool in tools:
+        if not keys_by_file[tool] and not (tool == 'pylint' and cross_file_key):
+            findings = merge_tool_findings(tool, ordering, with_cross_file_findings(tool, findings_by_file[tool], cross_file_findings))
+            yield {"event": "result", "tool": tool, "findings": findings, "timing": 0.0, "status": "complete"}
+
+    if any(keys_by_file.values()) or cross_file_key:
+        weights = {file_name: len(content) for file_name, content in sources}
+        with analysis_workspace() as workspace:
+            paths = {file_name: write_workspace_file(workspace, file_name, content) for file_name, content in sources}
+            for file_info in context:
+                file_name = workspace_relative_path(file_info['fileName'])
+                paths[file_name] = write_workspace_file(workspace, file_name, normalize_source(file_info['content']))
+            pool = get_analyzer_pool()
+            completed = queue.Queue()
+            tasks = {}
+            submissions = []
+            for tool, missing in keys_by_file.items():
+                if not missing or tool in ARTIFACT_ANALYZERS:
+                    continue
+                tasks[tool] = {}
+                for index, shard in enumerate(shard_files(list(missing), weights, ANALYSIS_MAX_SHARDS)):
+                    submissions.append((index, tool, shard, None))
+            # The cross-module task covers no file of its own for the per-file
+            # cache, so it is tracked with an empty shard.
+            cross_file_task_id = None
+            if cross_file_key:
+                tasks.setdefault('pylint', {})
+                cross_file_task_id = next(analyzer_task_ids)
+                submissions.append((0, 'pylint', cross_file_names, cross_file_task_id))
+            # Cheap tools' shards are queued first, so even on a pool with a
+            # single worker a slow pylint run cannot keep bandit from
+            # finishing before the deadline.
+            submissions.sort(key=lambda submission: (POOL_TOOL_ORDER.index(submission[1]), submission[0]))
+            for _, tool, shard, task_id in submissions:
+                options = {'cross_file': True} if task_id else None
+                task_id = task_id or next(analyzer_task_ids)
+                tasks[tool][task_id] = [] if options else shard
+                pool.apply_async(
+                    run_analyzer,
+                    (tool, [paths[file_name] for file_name in shard], profile, task_id, deadlines[tool], options),
+                    callback=lambda result, tool=tool, task_id=task_id: completed.put((tool, task_id, result)),
+                    error_callback=lambda error, tool=tool, task_id=task_id: completed.put(
+                        (tool, task_id, (FAILED_ANALYSIS[tool], None))
+                    )
+                )
+
+            # The artifact tools run here while the pool works on the others.
+            for tool in ARTIFACT_ANALYZERS:
+                if keys_by_file.get(tool):
+                    task_id = next(analyzer_task_ids)
+                    tasks[tool] = {task_id: list(keys_by_file[tool])}
+                    result = run_analyzer(tool, [artifacts[file_name] for file_name in keys_by_file[tool]], profile)
+                    completed.put((tool, task_id, result))
+
+            running = set(tasks)
+            finished = {tool: set() for tool in tasks}
+            collected = {tool: [] for tool in tasks}
+            truncated = set()
+            while running:
+                try:
+                    tool, task_id, result = completed.get(timeout=max(0.0, min(deadlines[tool] for tool in running) - time.monotonic()))
+                except queue.Empty:
+                    # Tools past their deadline keep the shards that finished;
+                    # the others keep waiting for their own deadlines.
+                    settled = {
+                        tool: 'partial' if finished[tool] else 'timed_out'
+                        for tool in running if deadlines[tool] <= time.monotonic()
+                    }
+                else:
+                    # A task that only started after its deadline returns None.
+                    if tool not in running or result is None:
+                        continue
+                    finished[tool].add(task_id)
+                    if result[0] == FAILED_ANALYSIS[tool]:
+                        running.discard(tool)
+                        settle_analyzer_tasks(tasks[tool], finished[tool])
+                        statuses[tool] = 'failed'
+                        timings[tool] = None
+                        yield {"event": "result", "tool": tool, "findings": list(FAILED_ANALYSIS[tool]), "timing": None, "status": "failed"}
+                        continue
+                    shard_findings, elapsed = result
+                    timings[tool] = max(timings[tool], elapsed)
+                    if task_id == cross_file_task_id:
+                        relativize_findings(workspace, tool, shard_findings)
+                        analysis_cache.put_many([(cross_file_key, shard_findings)])
+                        cross_file_findings = shard_findings
+                    else:
+                        collected[tool].extend(shard_findings)
+                    yield {
+                        "event": "progress",
+                        "tool": tool,
+                        "shards_done": len(finished[tool]),
+                        "shards_total": len(tasks[tool]),
+                    }
+                    if tool in EARLY_STOP_TOOLS and (
+                        (settings['max_findings'] and len(collected[tool]) + sum(map(len, findings_by_file[tool].values())) >= settings['max_findings'])
+                        or (settings['stop_on_fatal'] and any(finding.get('type') == 'fatal' for finding in shard_findings))
+                    ):
+                        truncated.add(tool)
+                    elif len(finished[tool]) < len(tasks[tool]):
+                        continue
+                    settled = {tool: 'partial' if tool in truncated else 'complete'}
+
+                for tool, status in settled.items():
+                    running.discard(tool)
+                    settle_analyzer_tasks(tasks[tool], finished[tool])
+                    statuses[tool] = status
+                    if status == 'timed_out':
+                        timings[tool] = None
+                    if tool not in ARTIFACT_ANALYZERS:
+                        relativize_findings(workspace, tool, collected[tool])
+                    covered = [file_name for task_id in finished[tool] for file_name in tasks[tool][task_id]]
+                    fresh = {file_name: [] for file_name in covered}
+                    for finding in collected[tool]:
+                        fresh.setdefault(finding.get(FINDING_PATH_KEYS[tool]), []).append(finding)
+                    # Shards that finished before the deadline covered their
+                    # files completely; a run that stopped early did not.
+                    if tool not in truncated:
+                        analysis_cache.put_many([(keys_by_file[tool][name], fresh[name]) for name in covered])
+                    findings_by_file[tool].update(fresh)
+                    findings = merge_tool_findings(
+                        tool, ordering, with_cross_file_findings(tool, findings_by_file[tool], cross_file_findings)
+                    )
+                    event = {"event": "result", "tool": tool, "findings": findings, "timing": timings[tool], "status": status}
+                    if tool in truncated:
+                        event.update(findings=findings[:settings['max_findings']] if settings['max_findings'] else findings, truncated=True)
+                    yield event
+
+    yield {"event": "done", "profile": profile, "timings": timings, "status": statuses, **unparsable_fields(syntax_errors, tools)}
+
+def collect_analysis(events):
+    final_results = {}
+    for event in events:
+        if event['event'] == 'result':
+            final_results[event['tool']] = event['findings']
+            if event.get('truncated'):
+                final_results.setdefault('truncated', []).append(event['tool'])
+        elif event['event'] == 'progress' and event.get('stage') == 'resolve':
+            final_results['repo'] = event['repo']
+        elif event['event'] == 'done':
+            if 'commit' in event:
+                final_results['commit'] = event['commit']
+            final_results['profile'] = event['profile']
+            final_results['timings'] = event['timings']
+            final_results['status'] = event['status']
+            final_results['unparsable'] = event['unparsable']
+            if 'syntax_errors' in event:
+                final_results['syntax_errors'] = event['syntax_errors']
+    return final_results
+
+def analyze_files(files, profile=ANALYSIS_DEFAULT_PROFILE):
+    return collect_analysis(iter_analysis(files, profile=profile))
+
+# --- Finding Filters ---
+# Minimum levels a request can set per tool, named as in the query string.
+# Findings below them are dropped from result events before anything is
+# serialized. Cached and memoized findings stay unfiltered, so requests with
+# different thresholds still share them.
+FINDING_THRESHOLDS = {
+    'pylint_severity': ('pylint', 'type', ['info', 'convention', 'refactor', 'warning', 'error', 'fatal']),
+    'bandit_severity': ('bandit', 'issue_severity', ['UNDEFINED', 'LOW', 'MEDIUM', 'HIGH']),
+    'bandit_confidence': ('bandit', 'issue_confidence', ['UNDEFINED', 'LOW', 'MEDIUM', 'HIGH']),
+}
+
+def parse_analysis_selection(args):
+    tools = None
+    if args.get('tools') is not None:
+        tools = {tool.strip() for tool in args['tools'].split(',') if tool.strip()}
+        if not tools or tools - set(ANALYZERS):
+            raise ValueError("Unknown analysis tool.")
+        tools = [tool for tool in ANALYZERS if tool in tools]
+    thresholds = {}
+    for name, (_, _, levels) in FINDING_THRESHOLDS.items():
+        value = args.get(name)
+        if value is None:
+            continue
+        level = next((level for level in levels if level.lower() == value.strip().lower()), None)
+        if level is None:
+            raise ValueError(f"Unknown {name.replace('_', ' ')} level.")
+        thresholds[name] = level
+    return tools, thresholds
+
+def filter_findings(events, thresholds):
+    minimums = {}
+    for name, level in thresholds.items():
+        tool, key, levels = FINDING_THRESHOLDS[name]
+        minimums.setdefault(tool, []).append((key, {value: rank for rank, value in enumerate(levels)}, levels.index(level)))
+    for event in events:
+        if event['event'] == 'result' and event['tool'] in minimums:
+            # Placeholders for failed runs carry no level and always pass.
+            kept = [
+                finding for finding in event['findings']
+                if all(ranks.get(finding.get(key), minimum) >= minimum for key, ranks, minimum in minimums[event['tool']])
+            ]
+            event = dict(event, findings=kept, filtered=len(event['findings']) - len(kept))
+        yield event
+
+# --- Repository Analysis ---
+# Without the mirror cache below, repositories are cloned at depth 1 with a
+# blob filter and a '*.py'-only sparse checkout, so only the Python sources of
+# the tip commit are ever downloaded. Either way the checked-out files go
+# through the regular file pipeline.
+GITHUB_URL = os.environ.get('GITHUB_URL', 'https://github.com')
+REPO_MAX_FILES = int(os.environ.get('REPO_MAX_FILES', 500))
+REPO_MAX_FILE_BYTES = int(os.environ.get('REPO_MAX_FILE_BYTES', 500 * 1024))
+REPO_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-][A-Za-z0-9_.-]*/(?!\.\.?$)[A-Za-z0-9_.-]+$')
+
+class RepositoryFetchError(Exception):
+    pass
+
+def fetch_time_left(deadline):
+    # Network and git calls of the fetch stage get what is left of its share
+    # of the request deadline as their timeout.
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise RepositoryFetchError("Fetching the repository took too long.")
+    return remaining
+
+def repository_clone_url(repo_name):
+    return f"{GITHUB_URL}/{repo_name}.git"
+
+def git_auth_env(github_token):
+    # The token travels in the environment of each git command, so it never
+    # shows up in a process list or in a cached repository's config.
+    env = {'GIT_TERMINAL_PROMPT': '0'}
+    if github_token:
+        credentials = base64.b64encode(f"x-access-token:{github_token}".encode()).decode()
+        env.update({
+            'GIT_CONFIG_COUNT': '1',
+            'GIT_CONFIG_KEY_0': 'http.extraHeader',
+            'GIT_CONFIG_VALUE_0': f"Authorization: Basic {credentials}",
+        })
+    return env
+
+def read_python_sources(root):
+    files = []
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names[:] = sorted(name for name in dir_names if name != '.git')
+        for file_name in sorted(file_names):
+            file_path = os.path.join(dir_path, file_name)
+            if not file_name.endswith('.py') or os.path.getsize(file_path) > REPO_MAX_FILE_BYTES:
+                continue
+            if len(files) >= REPO_MAX_FILES:
+                return files
+            with open(file_path, encoding='utf-8', errors='replace') as f:
+                files.append({"fileName": os.path.relpath(file_path, root), "content": f.read()})
+    return files
+
+@contextlib.contextmanager
+def shallow_checkout(repo_name, github_token, deadline):
+    with tempfile.TemporaryDirectory(prefix='clone-', dir=WORKSPACE_ROOT) as clone_dir:
+        env = git_auth_env(github_token)
+        # git.Git rather than git.Repo.clone_from, which cannot time out.
+        git.Git().clone(
+            repository_clone_url(repo_name), clone_dir, env=env,
+            depth=1, filter='blob:none', no_checkout=True, kill_after_timeout=fetch_time_left(deadline)
+        )
+        checkout = git.Git(clone_dir)
+        checkout.sparse_checkout('set', '--no-cone', '*.py', env=env, kill_after_timeout=fetch_time_left(deadline))
+        checkout.checkout(env=env, kill_after_timeout=fetch_time_left(deadline))
+        yield clone_dir
+
+# --- Repository Mirror Cache ---
+# Repeatedly analyzed repositories are kept as blob-filtered bare clones
+# ("mirrors") keyed by full name. Only branches and tags are fetched; a true
+# mirror's refs/* would also pull every pull request head and merge ref, so
+# its fetches would grow with the PR count. Each analysis fetches
+# incrementally into the mirror and checks out a sparse worktree from it. A per-repo file lock serializes
+# fetches (an analysis that waited on someone else's fetch reuses it) and
+# keeps eviction away from mirrors in use; least recently used mirrors are
+# evicted once the cache exceeds REPO_CACHE_MAX_BYTES.
+REPO_CACHE_ENABLED = os.environ.get('REPO_CACHE_ENABLED', '1') == '1'
+REPO_CACHE_DIR = os.environ.get('REPO_CACHE_DIR', os.path.join(app.instance_path, 'repo_cache'))
+REPO_CACHE_MAX_BYTES = int(os.environ.get('REPO_CACHE_MAX_BYTES', 2 * 1024 * 1024 * 1024))
+MIRROR_FETCH_REFSPECS = ['+refs/heads/*:refs/heads/*', '+refs/tags/*:refs/tags/*']
+
+def mirror_path(repo_name):
+    return os.path.join(REPO_CACHE_DIR, repo_name.replace('/', '__') + '.git')
+
+@contextlib.contextmanager
+def repository_lock(repo_name, exclusive=True, blocking=True):
+    os.makedirs(REPO_CACHE_DIR, exist_ok=True)
+    with open(mirror_path(repo_name) + '.lock', 'a') as lock_file:
+        flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        fcntl.flock(lock_file, flags if blocking else flags | fcntl.LOCK_NB)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def refresh_mirror(repo_name, github_token, deadline):
+    path = mirror_path(repo_name)
+    fetched_marker = path + '.fetched'
+    requested_at = time.time()
+    env = git_auth_env(github_token)
+    with repository_lock(repo_name):
+        if os.path.isdir(path) and os.path.exists(fetched_marker) \
+                and os.path.getmtime(fetched_marker) >= requested_at:
+            return path
+        # A mirror cloned with another refspec, such as the refs/* of an
+        # older --mirror clone, is dropped and cloned again.
+        if os.path.isdir(path) and mirror_refspecs(path) != MIRROR_FETCH_REFSPECS:
+            shutil.rmtree(path)
+        if os.path.isdir(path):
+            git.Git(path).fetch('--prune', 'origin', env=env, kill_after_timeout=fetch_time_left(deadline))
+        else:
+            staging = tempfile.mkdtemp(prefix='mirror-', dir=REPO_CACHE_DIR)
+            try:
+                git.Git().clone(
+                    repository_clone_url(repo_name), staging, env=env,
+                    bare=True, filter='blob:none', kill_after_timeout=fetch_time_left(deadline)
+                )
+                # A bare clone sets no fetch refspec, so later fetches would
+                # only update FETCH_HEAD.
+                mirror = git.Git(staging)
+                for refspec in MIRROR_FETCH_REFSPECS:
+                    mirror.config('--add', 'remote.origin.fetch', refspec)
+                os.rename(staging, path)
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+        with open(fetched_marker, 'w'):
             pass
+    return path
+
+def mirror_refspecs(path):
+    try:
+        return git.Git(path).config('--get-all', 'remote.origin.fetch').split('\n')
+    except git.GitCommandError:
+        return []
 
-    final_results = {
-        "pylint": pylint_results,
-        "bandit": bandit_results,
-        "radon": radon_results
+def mirror_size(path):
+    total = 0
+    for dir_path, _, file_names in os.walk(path):
+        for file_name in file_names:
+            total += os.path.getsize(os.path.join(dir_path, file_name))
+    return total
+
+def evict_mirrors():
+    mirrors = []
+    for entry in os.listdir(REPO_CACHE_DIR):
+        path = os.path.join(REPO_CACHE_DIR, entry)
+        if entry.endswith('.git') and os.path.isdir(path):
+            last_used = os.path.getmtime(path + '.lock') if os.path.exists(path + '.lock') else 0
+            mirrors.append((last_used, entry[:-len('.git')].replace('__', '/', 1), path))
+    total = sum(mirror_size(path) for _, _, path in mirrors)
+    for _, repo_name, path in sorted(mirrors):
+        if total <= REPO_CACHE_MAX_BYTES:
+            break
+        try:
+            with repository_lock(repo_name, blocking=False):
+                size = mirror_size(path)
+                shutil.rmtree(path, ignore_errors=True)
+                if os.path.exists(path + '.fetched'):
+                    os.remove(path + '.fetched')
+                total -= size
+        except BlockingIOError:
+            continue
+
+@contextlib.contextmanager
+def mirror_checkout(repo_name, github_token, deadline):
+    path = refresh_mirror(repo_name, github_token, deadline)
+    env = git_auth_env(github_token)
+    # A shared lock keeps eviction away while the worktree is in use.
+    with repository_lock(repo_name, exclusive=False):
+        os.utime(mirror_path(repo_name) + '.lock')
+        # git.Git rather than git.Repo: once worktrees exist the mirror's
+        # core.bare lives in config.worktree, which GitPython does not read.
+        mirror = git.Git(path)
+        worktree = tempfile.mkdtemp(prefix='worktree-', dir=WORKSPACE_ROOT)
+        try:
+            mirror.worktree('add', '--no-checkout', '--detach', worktree, 'HEAD', env=env)
+            checkout = git.Git(worktree)
+            checkout.sparse_checkout('set', '--no-cone', '*.py', env=env, kill_after_timeout=fetch_time_left(deadline))
+            checkout.checkout(env=env, kill_after_timeout=fetch_time_left(deadline))
+            yield worktree
+        finally:
+            shutil.rmtree(worktree, ignore_errors=True)
+            mirror.worktree('prune')
+    evict_mirrors()
+
+def fetch_repository_files(repo_name, github_token, deadline, base_commit=None):
+    # With a base commit the git diff against it is computed inside the same
+    # checkout; only mirror checkouts have the history for that.
+    checkout = mirror_checkout if REPO_CACHE_ENABLED else shallow_checkout
+    try:
+        with checkout(repo_name, github_token, deadline) as root:
+            commit_sha = git.Git(root).rev_parse('HEAD')
+            changes = None
+            if base_commit and REPO_CACHE_ENABLED:
+                changes = diff_python_files(root, base_commit, commit_sha)
+            return read_python_sources(root), commit_sha, changes
+    except git.GitCommandError:
+        raise RepositoryFetchError(f"Failed to fetch repository {repo_name}")
+
+# --- Repository Tarball Ingestion ---
+# For one-off analyses the repository archive of a commit is downloaded from
+# the GitHub tarball endpoint instead of running git. The gzip stream is
+# decompressed and walked member by member as it arrives; only '.py' members
+# are read, so neither the archive nor its other contents are ever held on
+# disk or in memory. GITHUB_API_URL can point at a stand-in server.
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com')
+REPO_FETCH_MODES = ('git', 'tarball')
+REPO_FETCH_MODE = os.environ.get('REPO_FETCH_MODE', 'git')
+
+def github_api_headers(github_token, accept='application/vnd.github+json'):
+    headers = {'Accept': accept}
+    if github_token:
+        headers['Authorization'] = f'token {github_token}'
+    return headers
+
+def resolve_tarball_commit(repo_name, github_token, deadline, ref='HEAD'):
+    try:
+        response = requests.get(
+            f"{GITHUB_API_URL}/repos/{repo_name}/commits/{ref}",
+            headers=github_api_headers(github_token, accept='application/vnd.github.sha'),
+            timeout=fetch_time_left(deadline)
+        )
+    except requests.RequestException:
+        raise RepositoryFetchError(f"Failed to fetch repository {repo_name}")
+    if response.status_code != 200:
+        raise RepositoryFetchError(f"Failed to fetch repository {repo_name}")
+    return response.text.strip()
+
+def iter_python_members(archive, strip_components=1, deadline=None, limits=None):
+    # Yields (file name, raw content) one member at a time. Without `limits`
+    # reading stops quietly at REPO_MAX_FILES; with them an archive over their
+    # file count or uncompressed size is rejected. Every regular member counts
+    # towards the size, since a streamed archive has to be decompressed
+    # through the members it skips.
+    read_files = 0
+    total_bytes = 0
+    for member in archive:
+        if deadline is not None:
+            fetch_time_left(deadline)
+        if limits is not None and member.isfile():
+            total_bytes += member.size
+            if total_bytes > limits['bytes']:
+                raise ArchiveRejected("The archive is too large when unpacked.", 413)
+        if not member.isfile() or not member.name.endswith('.py') or member.size > REPO_MAX_FILE_BYTES:
+            continue
+        try:
+            file_name = workspace_relative_path(member.name.split('/', strip_components)[-1])
+        except ValueError:
+            continue
+        if read_files >= (limits['files'] if limits is not None else REPO_MAX_FILES):
+            if limits is not None:
+                raise ArchiveRejected("The archive holds too many Python files.", 413)
+            break
+        read_files += 1
+        yield file_name, archive.extractfile(member).read()
+
+def read_python_members(archive, deadline=None):
+    return [
+        {"fileName": file_name, "content": content.decode('utf-8', errors='replace')}
+        for file_name, content in iter_python_members(archive, deadline=deadline)
+    ]
+
+def fetch_repository_tarball(repo_name, github_token, commit_sha, deadline):
+    try:
+        with requests.get(
+            f"{GITHUB_API_URL}/repos/{repo_name}/tarball/{commit_sha}",
+            headers=github_api_headers(github_token), stream=True, timeout=fetch_time_left(deadline)
+        ) as response:
+            if response.status_code != 200:
+                raise RepositoryFetchError(f"Failed to fetch repository {repo_name}")
+            with tarfile.open(fileobj=response.raw, mode='r|gz') as archive:
+                return read_python_members(archive, deadline=deadline)
+    except (requests.RequestException, tarfile.TarError, EOFError, zlib.error):
+        raise RepositoryFetchError(f"Failed to fetch repository {repo_name}")
+
+# --- Archive Uploads ---
+# /analyze/archive takes a zip or tar.gz upload as the raw request body. A
+# tar.gz is decompressed and walked member by member straight off the request
+# stream; a zip keeps its directory at the end, so it is first copied to a
+# temporary file on disk. Only the Python members are read, one at a time, and
+# each is written into a workspace of the upload's own as soon as it is read,
+# with the limits enforced along the way. The request never collects the body
+# or the decoded members, and a queued job carries the workspace path and
+# member names rather than the sources; whoever runs the analysis removes the
+# workspace. Member paths are kept as they are in the archive.
+ARCHIVE_MAX_BYTES = int(os.environ.get('ARCHIVE_MAX_BYTES', 50 * 1024 * 1024))
+ARCHIVE_MAX_UNPACKED_BYTES = int(os.environ.get('ARCHIVE_MAX_UNPACKED_BYTES', 100 * 1024 * 1024))
+ARCHIVE_MAX_FILES = int(os.environ.get('ARCHIVE_MAX_FILES', REPO_MAX_FILES))
+ARCHIVE_CHUNK_BYTES = 64 * 1024
+
+ARCHIVE_FORMATS = {
+    'application/zip': 'zip',
+    'application/x-zip-compressed': 'zip',
+    'application/gzip': 'tar.gz',
+    'application/x-gzip': 'tar.gz',
+    'application/x-compressed-tar': 'tar.gz',
+}
+
+class ArchiveRejected(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def spool_to_disk(stream, max_bytes):
+    spool = tempfile.TemporaryFile(dir=WORKSPACE_ROOT)
+    copied = 0
+    while True:
+        chunk = stream.read(ARCHIVE_CHUNK_BYTES)
+        if not chunk:
+            break
+        copied += len(chunk)
+        if copied > max_bytes:
+            spool.close()
+            raise ArchiveRejected("The archive is too large.", 413)
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+def iter_zip_python_members(archive, limits):
+    read_files = 0
+    total_bytes = 0
+    for info in archive.infolist():
+        if info.is_dir() or not info.filename.endswith('.py') or info.file_size > REPO_MAX_FILE_BYTES:
+            continue
+        try:
+            file_name = workspace_relative_path(info.filename)
+        except ValueError:
+            continue
+        if read_files >= limits['files']:
+            raise ArchiveRejected("The archive holds too many Python files.", 413)
+        # The sizes in a zip directory are not to be trusted, so reads stop
+        # just past the per-file limit whatever the member claims.
+        with archive.open(info) as member:
+            content = member.read(REPO_MAX_FILE_BYTES + 1)
+        if len(content) > REPO_MAX_FILE_BYTES:
+            continue
+        total_bytes += len(content)
+        if total_bytes > limits['bytes']:
+            raise ArchiveRejected("The archive is too large when unpacked.", 413)
+        read_files += 1
+        yield file_name, content
+
+def write_archive_members(workspace, members):
+    file_names = []
+    for file_name, content in members:
+        write_workspace_file(workspace, file_name, content.decode('utf-8', errors='replace'))
+        file_names.append(file_name)
+    return file_names
+
+def read_archive_upload(stream, mimetype, content_length, workspace):
+    archive_format = ARCHIVE_FORMATS.get(mimetype)
+    if archive_format is None:
+        raise ArchiveRejected("Upload a zip or tar.gz archive.", 415)
+    if content_length is not None and content_length > ARCHIVE_MAX_BYTES:
+        raise ArchiveRejected("The archive is too large.", 413)
+    limits = {'files': ARCHIVE_MAX_FILES, 'bytes': ARCHIVE_MAX_UNPACKED_BYTES}
+    try:
+        if archive_format == 'tar.gz':
+            with tarfile.open(fileobj=stream, mode='r|gz') as archive:
+                return write_archive_members(workspace, iter_python_members(archive, strip_components=0, limits=limits))
+        with spool_to_disk(stream, ARCHIVE_MAX_BYTES) as spool, zipfile.ZipFile(spool) as archive:
+            return write_archive_members(workspace, iter_zip_python_members(archive, limits))
+    # A member clashing with a directory of the same name cannot be unpacked.
+    except (tarfile.TarError, zipfile.BadZipFile, EOFError, zlib.error, NotImplementedError, RuntimeError,
+            FileExistsError, IsADirectoryError, NotADirectoryError):
+        raise ArchiveRejected("The archive could not be read.")
+
+def release_payload_workspace(payload):
+    if 'workspace' in payload:
+        shutil.rmtree(payload['workspace'], ignore_errors=True)
+
+# --- Repository Result Memoization ---
+# A repository analysis is fully determined by the commit, the toolchain and
+# the profile, so finished results are stored in the analysis cache under
+# (repo, commit SHA, profile toolchain fingerprint). The tip commit is
+# resolved with an authenticated ls-remote, which also proves the requesting
+# user can read the repository before a result produced for someone else is
+# handed out.
+# A tool upgrade changes the fingerprint, so stale entries stop matching and
+# age out of the cache.
+TOOLCHAIN_FINGERPRINTS = {
+    profile: hashlib.sha256(json.dumps([profile, TOOL_FINGERPRINTS[profile]], sort_keys=True).encode()).hexdigest()[:16]
+    for profile in ANALYSIS_PROFILES
+}
+
+def repository_result_key(repo_name, commit_sha, profile):
+    return f"repo:{TOOLCHAIN_FINGERPRINTS[profile]}:{repo_name}@{commit_sha}"
+
+def resolve_repository_commit(repo_name, github_token, deadline):
+    try:
+        output = git.Git().ls_remote(
+            repository_clone_url(repo_name), 'HEAD', env=git_auth_env(github_token),
+            kill_after_timeout=fetch_time_left(deadline)
+        )
+    except git.GitCommandError:
+        raise RepositoryFetchError(f"Failed to fetch repository {repo_name}")
+    if not output:
+        raise RepositoryFetchError(f"Repository {repo_name} has no commits")
+    return output.split()[0]
+
+def repository_latest_key(repo_name, profile):
+    return f"repo-latest:{TOOLCHAIN_FINGERPRINTS[profile]}:{repo_name}"
+
+def iter_repository_analysis(repo_name, github_token, fetch_mode='git', profile=ANALYSIS_DEFAULT_PROFILE, tools=None,
+                             deadline=None):
+    tools = [tool for tool in ANALYZERS if tools is None or tool in tools]
+    started = time.monotonic()
+    if deadline is None:
+        deadline = started + ANALYSIS_DEADLINE
+    fetch_deadline = started + (deadline - started) * ANALYSIS_FETCH_SHARE
+    yield {"event": "progress", "stage": "resolve", "repo": repo_name}
+    if fetch_mode == 'tarball':
+        commit_sha = resolve_tarball_commit(repo_name, github_token, fetch_deadline)
+    else:
+        commit_sha = resolve_repository_commit(repo_name, github_token, fetch_deadline)
+    memoized = analysis_cache.get(repository_result_key(repo_name, commit_sha, profile))
+    if memoized is not None:
+        for tool in tools:
+            yield {"event": "result", "tool": tool, "findings": memoized[tool], "timing": 0.0, "status": "complete"}
+        yield {
+            "event": "done",
+            "profile": profile,
+            "timings": {tool: 0.0 for tool in tools},
+            "status": {tool: 'complete' for tool in tools},
+            "commit": commit_sha,
+            "memoized": True,
+            # A memoized run had every tool, so its pylint findings hold the
+            # syntax errors.
+            **unparsable_fields([finding for finding in memoized[SYNTAX_ERROR_TOOL] if finding.get('symbol') == 'syntax-error'], tools),
+        }
+        return
+
+    base_commit = analysis_cache.get(repository_latest_key(repo_name, profile))
+    previous = analysis_cache.get(repository_result_key(repo_name, base_commit, profile)) if base_commit else None
+    yield {"event": "progress", "stage": "fetch", "repo": repo_name, "commit": commit_sha, "fetch": fetch_mode}
+    if fetch_mode == 'tarball':
+        files, changes = fetch_repository_tarball(repo_name, github_token, commit_sha, fetch_deadline), None
+    else:
+        files, commit_sha, changes = fetch_repository_files(
+            repo_name, github_token, fetch_deadline, base_commit if previous else None
+        )
+    file_names = [workspace_relative_path(file_info['fileName']) for file_info in files]
+    if previous is not None and changes is not None:
+        events = iter_incremental_analysis(files, file_names, previous, changes, base_commit, profile, tools, deadline)
+    else:
+        events = iter_analysis(files, profile=profile, tools=tools, deadline=deadline)
+
+    results = {}
+    for event in events:
+        if event['event'] == 'result':
+            results[event['tool']] = event['findings']
+        if event['event'] == 'done':
+            event = dict(event, commit=commit_sha, memoized=False)
+            # Only a run in which every tool completed is worth replaying; one
+            # limited to some tools cannot answer requests for the rest.
+            if len(tools) == len(ANALYZERS) and all(status == 'complete' for status in event['status'].values()):
+                results['files'] = file_names
+                analysis_cache.put_many([
+                    (repository_result_key(repo_name, commit_sha, profile), results),
+                    (repository_latest_key(repo_name, profile), commit_sha),
+                ])
+        yield event
+
+# --- Incremental Repository Analysis ---
+# When the repository was analyzed before at another commit, only the Python
+# files that git reports as changed since then, the files importing them and
+# files the previous run did not cover are re-analyzed. Findings for every
+# other file are carried over from the previous result, so the cost follows
+# the size of the diff rather than the size of the repository.
+def diff_python_files(root, base_commit, commit_sha):
+    # --no-renames keeps this to tree comparisons, which a blob-filtered
+    # mirror can answer without downloading any file contents.
+    checkout = git.Git(root)
+    try:
+        checkout.cat_file('-e', f"{base_commit}^{{commit}}")
+        output = checkout.diff('--name-status', '--no-renames', '-z', base_commit, commit_sha, '--', '*.py')
+    except git.GitCommandError:
+        return None
+    fields = [field for field in output.split('\0') if field]
+    changes = {'changed': set(), 'deleted': set()}
+    for status, path in zip(fields[0::2], fields[1::2]):
+        changes['deleted' if status == 'D' else 'changed'].add(os.path.normpath(path))
+    return changes
+
+def module_name(file_name):
+    parts = file_name[:-len('.py')].split(os.sep)
+    if parts[-1] == '__init__':
+        parts = parts[:-1]
+    return '.'.join(parts)
+
+def imported_modules(artifacts):
+    file_name, tree = artifacts['file_name'], artifacts['tree']
+    if tree is None:
+        return set()
+    package = module_name(file_name).split('.')
+    if not file_name.endswith('__init__.py'):
+        package = package[:-1]
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = package[:len(package) - node.level + 1] if node.level else []
+            prefix = '.'.join(base + ([node.module] if node.module else []))
+            if prefix:
+                modules.add(prefix)
+            modules.update(f"{prefix}.{alias.name}" if prefix else alias.name for alias in node.names)
+    return modules
+
+def find_importers(file_artifacts, changed_modules):
+    importers = set()
+    for artifacts in file_artifacts:
+        for imported in imported_modules(artifacts):
+            if any(imported == module or imported.startswith(module + '.') for module in changed_modules):
+                importers.add(artifacts['file_name'])
+                break
+    return importers
+
+def iter_incremental_analysis(files, file_names, previous, changes, base_commit, profile, tools=None, deadline=None):
+    changed_modules = {module_name(path) for path in changes['changed'] | changes['deleted']}
+    artifacts = {
+        file_name: build_artifacts(file_name, file_info['content'])
+        for file_info, file_name in zip(files, file_names)
+    }
+    importers = find_importers(artifacts.values(), changed_modules)
+    rerun = (changes['changed'] | importers | (set(file_names) - set(previous.get('files', [])))) & set(file_names)
+    yield {
+        "event": "progress",
+        "stage": "diff",
+        "base": base_commit,
+        "changed": len(changes['changed']),
+        "deleted": len(changes['deleted']),
+        "importers": len(importers - changes['changed']),
+        "reanalyzed": len(rerun),
+    }
+    carried = {tool: {} for tool in ANALYZERS}
+    for tool in ANALYZERS:
+        for finding in previous[tool]:
+            carried[tool].setdefault(finding.get(FINDING_PATH_KEYS[tool]), []).append(finding)
+
+    rerun_files = [file_info for file_info, file_name in zip(files, file_names) if file_name in rerun]
+    context_files = [file_info for file_info, file_name in zip(files, file_names) if file_name not in rerun]
+    events = iter_analysis(
+        rerun_files, refresh=importers, context=context_files, artifacts=artifacts,
+        profile=profile, tools=tools, deadline=deadline
+    )
+    # Cross-module findings were just computed over the whole repository, so
+    # they replace the carried ones of files that were not re-analyzed.
+    cross_file = ANALYSIS_PROFILES[profile]['cross_file_checks']
+    for event in events:
+        if event['event'] == 'result' and event['status'] != 'failed':
+            tool = event['tool']
+            fresh = {}
+            for finding in event['findings']:
+                fresh.setdefault(finding.get(FINDING_PATH_KEYS[tool]), []).append(finding)
+            findings_by_file = {
+                file_name: fresh.get(file_name, []) if file_name in rerun else carried[tool].get(file_name, [])
+                for file_name in file_names
+            }
+            if tool == 'pylint' and cross_file:
+                for file_name in set(file_names) - rerun:
+                    findings_by_file[file_name] = [
+                        finding for finding in findings_by_file[file_name] if finding.get('symbol') not in CROSS_FILE_PYLINT_CHECKS
+                    ] + [finding for finding in fresh.get(file_name, []) if finding.get('symbol') in CROSS_FILE_PYLINT_CHECKS]
+            event = dict(event, findings=merge_tool_findings(tool, [(name, None) for name in file_names], findings_by_file))
+        if event['event'] == 'done':
+            # Files that were not re-analyzed are still unparsable.
+            syntax_errors = [dict(artifacts[name]['syntax_error']) for name in file_names if artifacts[name]['syntax_error'] is not None]
+            event = dict(event, **unparsable_fields(syntax_errors, tools or ANALYZERS))
+        yield event
+
+def iter_request_analysis(payload, github_token=None):
+    profile = payload.get('profile', ANALYSIS_DEFAULT_PROFILE)
+    tools = payload.get('tools')
+    deadline = time.monotonic() + ANALYSIS_DEADLINE
+    if 'repo' in payload:
+        events = iter_repository_analysis(payload['repo'], github_token, payload.get('fetch', 'git'), profile, tools, deadline)
+    elif 'workspace' in payload:
+        files = read_workspace_files(payload['workspace'], payload['fileNames'])
+        events = iter_analysis(files, profile=profile, tools=tools, deadline=deadline)
+    else:
+        events = iter_analysis(payload['files'], profile=profile, tools=tools, deadline=deadline)
+    yield from filter_findings(events, payload.get('thresholds', {}))
+
+def stream_analysis(events):
+    try:
+        for event in events:
+            yield json.dumps(event) + '\n'
+    except RepositoryFetchError as e:
+        yield json.dumps({"event": "error", "error": str(e)}) + '\n'
+    except Exception as e:
+        # Past the first line the status is already sent, so a failure can
+        # only be reported as the stream's last event.
+        yield json.dumps({"event": "error", "error": f"Analysis failed: {str(e)}"}) + '\n'
+
+# --- Analysis Jobs ---
+# /analyze enqueues a job row in the app database and returns straight away;
+# job workers claim queued rows and store the results, so web workers are
+# never held for the duration of an analysis. Workers run either as threads in
+# the web process (ANALYSIS_EMBEDDED_JOB_WORKERS) or as a separate
+# `flask analysis-worker` process. A job left 'running' past its lease by a
+# dead worker is put back in the queue.
+ANALYSIS_DEFAULT_MODE = os.environ.get('ANALYSIS_DEFAULT_MODE', 'job')
+ANALYSIS_EMBEDDED_JOB_WORKERS = int(os.environ.get('ANALYSIS_EMBEDDED_JOB_WORKERS', 1))
+ANALYSIS_JOB_LEASE_SECONDS = int(os.environ.get('ANALYSIS_JOB_LEASE_SECONDS', 600))
+ANALYSIS_JOB_POLL_INTERVAL = 0.5
+
+job_wakeup = threading.Event()
+embedded_job_workers_pid = None
+
+def enqueue_analysis_job(payload, user_id=None):
+    job = AnalysisJob(id=str(uuid.uuid4()), status='queued', payload=json.dumps(payload), user_id=user_id)
+    db.session.add(job)
+    db.session.commit()
+    job_wakeup.set()
+    return job
+
+def claim_analysis_job():
+    lease_expiry = datetime.datetime.utcnow() - datetime.timedelta(seconds=ANALYSIS_JOB_LEASE_SECONDS)
+    AnalysisJob.query.filter(AnalysisJob.status == 'running', AnalysisJob.started_at < lease_expiry) \
+        .update({'status': 'queued'}, synchronize_session=False)
+    db.session.commit()
+    while True:
+        job = AnalysisJob.query.filter_by(status='queued').order_by(AnalysisJob.created_at, AnalysisJob.id).first()
+        if job is None:
+            return None
+        # The conditional update is the claim: only one worker can move a
+        # given row out of 'queued'.
+        claimed = AnalysisJob.query.filter_by(id=job.id, status='queued') \
+            .update({'status': 'running', 'started_at': datetime.datetime.utcnow()}, synchronize_session=False)
+        db.session.commit()
+        if claimed:
+            return job.id
+
+def run_analysis_job(job_id):
+    job = db.session.get(AnalysisJob, job_id)
+    payload = json.loads(job.payload)
+    # Jobs share the slots of requests analyzed inline but wait for one
+    # instead of being turned away.
+    entered = admission.enter(reject=False)
+    try:
+        owner = db.session.get(User, job.user_id) if job.user_id is not None else None
+        events = iter_request_analysis(payload, owner.github_token if owner else None)
+        job.result = json.dumps(collect_analysis(events))
+        job.status = 'complete'
+    except Exception as e:
+        job.error = str(e)
+        job.status = 'failed'
+    finally:
+        admission.leave(entered)
+        release_payload_workspace(payload)
+    job.finished_at = datetime.datetime.utcnow()
+    db.session.commit()
+
+def analysis_job_worker():
+    while True:
+        with app.app_context():
+            # Under memory pressure queued jobs stay queued until it eases.
+            job_id = None if memory_under_pressure() else claim_analysis_job()
+            if job_id is not None:
+                run_analysis_job(job_id)
+                continue
+        job_wakeup.wait(ANALYSIS_JOB_POLL_INTERVAL)
+        job_wakeup.clear()
+
+def start_embedded_job_workers():
+    global embedded_job_workers_pid
+    if embedded_job_workers_pid == os.getpid():
+        return
+    embedded_job_workers_pid = os.getpid()
+    for _ in range(ANALYSIS_EMBEDDED_JOB_WORKERS):
+        threading.Thread(target=analysis_job_worker, daemon=True).start()
+
+@app.cli.command('analysis-worker')
+@click.option('--threads', default=1, help='Number of jobs to run concurrently.')
+def analysis_worker_command(threads):
+    for _ in range(threads - 1):
+        threading.Thread(target=analysis_job_worker, daemon=True).start()
+    analysis_job_worker()
+
+def serialize_job(job):
+    data = {
+        "job_id": job.id,
+        "status": job.status,
+        "created_at": job.created_at.strftime('%Y-%m-%d %H:%M:%S') if job.created_at else None,
     }
-    return jsonify(final_results)
+    if job.status == 'complete':
+        data["result"] = json.loads(job.result)
+    if job.status == 'failed':
+        data["error"] = job.error
+    return data
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    job = db.session.get(AnalysisJob, job_id)
+    if job is None or (job.user_id is not None and (not current_user.is_authenticated or current_user.id != job.user_id)):
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(serialize_job(job))
+
+# --- Admission Control ---
+# At most ANALYSIS_MAX_CONCURRENT analyses run at once on the machine, across
+# every web process, counting inline (sync and stream) requests and embedded
+# job workers alike; every one of them can keep an analyzer pool busy, so more
+# would only queue inside it. Up to ANALYSIS_MAX_QUEUED inline requests wait
+# for a slot, each for at most ANALYSIS_QUEUE_TIMEOUT seconds. Beyond that
+# requests get a 429, and while available memory is below
+# ANALYSIS_MIN_AVAILABLE_MEMORY (a fraction of the machine's or the cgroup's
+# memory) they get a 503, both with a Retry-After estimated from recent
+# analysis durations. Job submissions are turned away once
+# ANALYSIS_MAX_QUEUED_JOBS jobs are waiting.
+# The running and waiting slots are lock files under ANALYSIS_SLOT_DIR, so
+# the limits hold however many web processes serve the app. The counters in
+# /analysis-stats other than running and queued are per web process.
+ANALYSIS_MAX_CONCURRENT = int(os.environ.get('ANALYSIS_MAX_CONCURRENT', 2))
+ANALYSIS_MAX_QUEUED = int(os.environ.get('ANALYSIS_MAX_QUEUED', 4))
+ANALYSIS_QUEUE_TIMEOUT = float(os.environ.get('ANALYSIS_QUEUE_TIMEOUT', 10))
+ANALYSIS_MAX_QUEUED_JOBS = int(os.environ.get('ANALYSIS_MAX_QUEUED_JOBS', 100))
+ANALYSIS_MIN_AVAILABLE_MEMORY = float(os.environ.get('ANALYSIS_MIN_AVAILABLE_MEMORY', 0.1))
+ANALYSIS_RETRY_AFTER = int(os.environ.get('ANALYSIS_RETRY_AFTER', 5))
+ANALYSIS_SLOT_DIR = os.environ.get('ANALYSIS_SLOT_DIR', os.path.join(app.instance_path, 'analysis_slots'))
+ANALYSIS_SLOT_POLL_INTERVAL = 0.1
+
+class AnalysisRejected(Exception):
+    def __init__(self, message, status, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+def available_memory_fraction():
+    fractions = []
+    try:
+        with open('/proc/meminfo') as f:
+            meminfo = {key: int(value.split()[0]) for key, value in (line.split(':', 1) for line in f)}
+        fractions.append(meminfo['MemAvailable'] / meminfo['MemTotal'])
+    except (OSError, KeyError, ValueError, ZeroDivisionError):
+        pass
+    try:
+        with open('/sys/fs/cgroup/memory.max') as f:
+            limit = f.read().strip()
+        if limit != 'max':
+            with open('/sys/fs/cgroup/memory.current') as f:
+                fractions.append(1 - int(f.read()) / int(limit))
+    except (OSError, ValueError, ZeroDivisionError):
+        pass
+    return min(fractions) if fractions else None
+
+def memory_under_pressure():
+    available = available_memory_fraction()
+    return available is not None and available < ANALYSIS_MIN_AVAILABLE_MEMORY
+
+class SharedSlots:
+    # Slot i is taken by holding a POSIX lock on lock file i. The kernel drops
+    # the lock when its process exits, and processes forked from the holder
+    # (the analyzer pool's workers) do not inherit it. POSIX locks belong to
+    # the whole process, so its threads keep track of the slots they hold
+    # among themselves, and the files stay open for as long as the process
+    # runs: closing one would drop its lock.
+    def __init__(self, path, count):
+        os.makedirs(path, exist_ok=True)
+        self.files = [open(os.path.join(path, f'{index}.lock'), 'a') for index in range(count)]
+        self.held = set()
+        self.lock = threading.Lock()
+
+    def try_lock(self, index):
+        try:
+            fcntl.lockf(self.files[index], fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        return True
+
+    def acquire(self):
+        with self.lock:
+            for index in range(len(self.files)):
+                if index not in self.held and self.try_lock(index):
+                    self.held.add(index)
+                    return index
+        return None
+
+    def release(self, index):
+        with self.lock:
+            fcntl.lockf(self.files[index], fcntl.LOCK_UN)
+            self.held.discard(index)
+
+    def taken(self):
+        # Slots held by any process.
+        with self.lock:
+            taken = len(self.held)
+            for index in range(len(self.files)):
+                if index in self.held:
+                    continue
+                if self.try_lock(index):
+                    fcntl.lockf(self.files[index], fcntl.LOCK_UN)
+                else:
+                    taken += 1
+        return taken
+
+class AdmissionControl:
+    def __init__(self, limit, max_queued, queue_timeout, slot_dir):
+        self.limit = limit
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.running = SharedSlots(os.path.join(slot_dir, 'running'), limit)
+        self.waiting = SharedSlots(os.path.join(slot_dir, 'waiting'), max_queued)
+        # Wakes this process's waiters as soon as one of its analyses ends;
+        # slots freed by other processes are noticed by polling.
+        self.condition = threading.Condition()
+        self.average_seconds = None
+        self.stats = {
+            'admitted': 0, 'rejected_queue_full': 0, 'rejected_queue_timeout': 0,
+            'rejected_memory': 0, 'rejected_job_queue_full': 0,
+        }
+
+    def retry_after(self, ahead):
+        # Roughly when the analyses ahead of a retry will have finished.
+        average = self.average_seconds or ANALYSIS_RETRY_AFTER
+        return max(1, math.ceil(average * (ahead + 1) / self.limit))
+
+    def enter(self, reject=True):
+        if reject and memory_under_pressure():
+            with self.condition:
+                self.stats['rejected_memory'] += 1
+            raise AnalysisRejected("The server is low on memory. Try again later.", 503, ANALYSIS_RETRY_AFTER)
+        slot = self.running.acquire()
+        if slot is None:
+            queued = None
+            if reject:
+                queued = self.waiting.acquire()
+                if queued is None:
+                    with self.condition:
+                        self.stats['rejected_queue_full'] += 1
+                    raise AnalysisRejected("Too many analyses in progress. Try again later.", 429, self.retry_after(self.max_queued))
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while slot is None and (not reject or time.monotonic() < deadline):
+                    with self.condition:
+                        self.condition.wait(ANALYSIS_SLOT_POLL_INTERVAL)
+                    slot = self.running.acquire()
+            finally:
+                if queued is not None:
+                    self.waiting.release(queued)
+            if slot is None:
+                with self.condition:
+                    self.stats['rejected_queue_timeout'] += 1
+                raise AnalysisRejected("Too many analyses in progress. Try again later.", 503, self.retry_after(self.waiting.taken()))
+        with self.condition:
+            self.stats['admitted'] += 1
+        return slot, time.monotonic()
+
+    def leave(self, entered):
+        slot, started = entered
+        self.running.release(slot)
+        with self.condition:
+            elapsed = time.monotonic() - started
+            self.average_seconds = elapsed if self.average_seconds is None else 0.8 * self.average_seconds + 0.2 * elapsed
+            self.condition.notify()
+
+    def reject_job(self, queued_jobs):
+        with self.condition:
+            self.stats['rejected_job_queue_full'] += 1
+        return AnalysisRejected("Too many queued analyses. Try again later.", 429, self.retry_after(queued_jobs))
+
+    def snapshot(self):
+        running, waiting = self.running.taken(), self.waiting.taken()
+        with self.condition:
+            stats = dict(self.stats)
+            stats.update({
+                'running': running,
+                'queued': waiting,
+                'limit': self.limit,
+                'max_queued': self.max_queued,
+                'average_seconds': round(self.average_seconds, 3) if self.average_seconds is not None else None,
+            })
+        return stats
+
+admission = AdmissionControl(ANALYSIS_MAX_CONCURRENT, ANALYSIS_MAX_QUEUED, ANALYSIS_QUEUE_TIMEOUT, ANALYSIS_SLOT_DIR)
+
+def rejection_response(rejection):
+    return jsonify({"error": str(rejection)}), rejection.status, {'Retry-After': str(rejection.retry_after)}
+
+# --- Analysis from Uploaded Files or a Repository ---
+@app.route('/analyze', methods=['POST'])
+def analyze_code():
+    data = request.get_json()
+    if isinstance(data, dict) and data.get('repoName'):
+        if not current_user.is_authenticated or not current_user.github_token:
+            return jsonify({"error": "Not logged in with GitHub"}), 403
+        if not REPO_NAME_PATTERN.match(data['repoName']):
+            return jsonify({"error": "Invalid repository name."}), 400
+        fetch_mode = data.get('fetch', REPO_FETCH_MODE)
+        if fetch_mode not in REPO_FETCH_MODES:
+            return jsonify({"error": "Unknown fetch mode."}), 400
+        payload = {"repo": data['repoName'], "fetch": fetch_mode}
+    else:
+        files = data
+        if not files or not isinstance(files, list):
+            return jsonify({"error": "No files provided"}), 400
+
+        if len(files) > 20 or any(len(f['content']) > 10000 for f in files):
+            return jsonify({"error": "Too many or too large files."}), 400
+
+        try:
+            for file_info in files:
+                workspace_relative_path(file_info['fileName'])
+        except ValueError:
+            return jsonify({"error": "Invalid file name."}), 400
+        payload = {"files": files}
+    return start_analysis(payload)
+
+@app.route('/analyze/archive', methods=['POST'])
+def analyze_archive():
+    # The request is admitted before its upload is read, so one that would be
+    # turned away does not first spool and unpack the whole archive.
+    payload = {}
+    admitted, rejected = admit_analysis(payload)
+    if rejected is not None:
+        return rejected
+    payload['workspace'] = tempfile.mkdtemp(prefix='archive-', dir=WORKSPACE_ROOT)
+    try:
+        payload['fileNames'] = read_archive_upload(request.stream, request.mimetype, request.content_length, payload['workspace'])
+    except ArchiveRejected as e:
+        failure = jsonify({"error": str(e)}), e.status
+    else:
+        if payload['fileNames']:
+            return run_analysis(payload, admitted)
+        failure = jsonify({"error": "No Python files in the archive."}), 400
+    if admitted['entered'] is not None:
+        admission.leave(admitted['entered'])
+    release_payload_workspace(payload)
+    return failure
+
+def start_analysis(payload):
+    admitted, rejected = admit_analysis(payload)
+    if rejected is not None:
+        return rejected
+    return run_analysis(payload, admitted)
+
+def admit_analysis(payload):
+    # Checks the request's options and takes an admission slot for an inline
+    # analysis, or checks the job queue for a job. Returns the admission and
+    # None, or None and the response turning the request away.
+    profile = request.args.get('profile', ANALYSIS_DEFAULT_PROFILE)
+    if profile not in ANALYSIS_PROFILES:
+        return None, (jsonify({"error": "Unknown analysis profile."}), 400)
+    payload['profile'] = profile
+    try:
+        tools, thresholds = parse_analysis_selection(request.args)
+    except ValueError as e:
+        return None, (jsonify({"error": str(e)}), 400)
+    if tools is not None:
+        payload['tools'] = tools
+    if thresholds:
+        payload['thresholds'] = thresholds
+
+    mode = request.args.get('mode', ANALYSIS_DEFAULT_MODE)
+    entered = None
+    try:
+        if mode in ('sync', 'stream'):
+            entered = admission.enter()
+        else:
+            queued_jobs = AnalysisJob.query.filter_by(status='queued').count()
+            if queued_jobs >= ANALYSIS_MAX_QUEUED_JOBS:
+                raise admission.reject_job(queued_jobs)
+    except AnalysisRejected as rejection:
+        return None, rejection_response(rejection)
+    return {'mode': mode, 'entered': entered}, None
+
+def run_analysis(payload, admitted):
+    github_token = current_user.github_token if current_user.is_authenticated else None
+    mode, entered = admitted['mode'], admitted['entered']
+    if mode == 'sync':
+        try:
+            return jsonify(collect_analysis(iter_request_analysis(payload, github_token)))
+        except RepositoryFetchError as e:
+            return jsonify({"error": str(e)}), 502
+        finally:
+            admission.leave(entered)
+            release_payload_workspace(payload)
+    if mode == 'stream':
+        events = stream_analysis(iter_request_analysis(payload, github_token))
+        response = Response(events, mimetype='application/x-ndjson', headers={'X-Accel-Buffering': 'no'})
+        # The slot and any upload workspace are held until the stream is done
+        # or the client goes away.
+        response.call_on_close(lambda: admission.leave(entered))
+        response.call_on_close(lambda: release_payload_workspace(payload))
+        return response
+
+    if ANALYSIS_EMBEDDED_JOB_WORKERS:
+        start_embedded_job_workers()
+    user_id = current_user.id if current_user.is_authenticated else None
+    job = enqueue_analysis_job(payload, user_id=user_id)
+    return jsonify({"job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"}), 202
+
+@app.route('/analysis-stats')
+def analysis_stats():
+    admission_stats = admission.snapshot()
+    admission_stats['queued_jobs'] = AnalysisJob.query.filter_by(status='queued').count()
+    admission_stats['available_memory'] = available_memory_fraction()
+    return jsonify({"cache": analysis_cache.snapshot(), "admission": admission_stats})
 
 # --- Suggestion Endpoint ---
 @app.route('/get-suggestion', methods=['POST'])
@@ -241,28 +2480,480 @@ def get_suggestion():
     except Exception as e:
         return jsonify({"error": f"AI suggestion failed: {str(e)}"}), 500
 
+# --- Report Blobs ---
+# Report JSON is stored compressed in ReportBlob rows keyed by the SHA-256 of
+# the uncompressed text, so saving the same payload again only adds a Report
+# row pointing at the existing blob. New blobs use zstd when the zstandard
+# package is installed and zlib otherwise; each blob records its codec, so
+# either kind reads back wherever its codec is available.
+REPORT_BLOB_CODEC = os.environ.get('REPORT_BLOB_CODEC', 'zstd' if zstandard else 'zlib')
+REPORT_BLOB_LEVELS = {'zlib': 6, 'zstd': 9}
+
+def compress_report_blob(raw, codec=REPORT_BLOB_CODEC):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=REPORT_BLOB_LEVELS['zstd']).compress(raw)
+    return zlib.compress(raw, REPORT_BLOB_LEVELS['zlib'])
+
+def decompress_report_blob(codec, data):
+    if codec == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+def read_report_blob(blob):
+    return decompress_report_blob(blob.codec, blob.data).decode('utf-8')
+
+def store_report_blob(content):
+    raw = content.encode('utf-8')
+    digest = hashlib.sha256(raw).hexdigest()
+    if db.session.get(ReportBlob, digest) is None:
+        blob = ReportBlob(digest=digest, codec=REPORT_BLOB_CODEC, size=len(raw), data=compress_report_blob(raw))
+        # Another worker may store the same payload first; its blob serves.
+        try:
+            with db.session.begin_nested():
+                db.session.add(blob)
+        except IntegrityError:
+            pass
+    return digest
+
+# --- Report History ---
+# Successive reports of a repository mostly repeat the same findings, so a
+# report saved with a 'repo' is stored as the delta from the previous report
+# of that repository: per tool, the edits that turn the previous findings list
+# into the new one, with the removed and added findings spelled out, plus the
+# report's other fields as they are. Every REPORT_SNAPSHOT_INTERVAL reports,
+# or when a delta would not be much smaller than the report, a full snapshot
+# is stored instead, which bounds how far a read has to walk back. The delta
+# of a report is also what changed since the previous one.
+REPORT_SNAPSHOT_INTERVAL = int(os.environ.get('REPORT_SNAPSHOT_INTERVAL', 20))
+REPORT_DELTA_MAX_RATIO = 0.5
+
+def finding_key(item):
+    return json.dumps(item, sort_keys=True)
+
+def report_delta(base, data):
+    delta, fields = {}, {}
+    for key, value in data.items():
+        old = base.get(key, [])
+        if key not in ANALYZERS or not isinstance(value, list) or not isinstance(old, list):
+            fields[key] = value
+            continue
+        matcher = difflib.SequenceMatcher(None, [finding_key(item) for item in old], [finding_key(item) for item in value])
+        delta[key] = [
+            [i1, old[i1:i2], value[j1:j2]]
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal'
+        ]
+    return {'delta': delta, 'fields': fields}
+
+def apply_report_delta(base, doc):
+    data = dict(doc['fields'])
+    for key, edits in doc['delta'].items():
+        old, items, position = base.get(key, []), [], 0
+        for start, removed, added in edits:
+            items.extend(old[position:start])
+            items.extend(added)
+            position = start + len(removed)
+        items.extend(old[position:])
+        data[key] = items
+    return data
+
+def delta_changes(doc):
+    # A finding that only moved within its list is both removed and added by
+    # the edits; it is not a change.
+    changes = {'added': {}, 'removed': {}}
+    for key, edits in doc['delta'].items():
+        removed = [item for _, items, _ in edits for item in items]
+        added = [item for _, _, items in edits for item in items]
+        moved = Counter(map(finding_key, removed)) & Counter(map(finding_key, added))
+        for change, items in (('removed', removed), ('added', added)):
+            remaining = moved.copy()
+            changes[change][key] = []
+            for item in items:
+                item_key = finding_key(item)
+                if remaining[item_key]:
+                    remaining[item_key] -= 1
+                else:
+                    changes[change][key].append(item)
+    return changes
+
+def load_report_data(report, memo=None):
+    # Walks back to the nearest snapshot, or to a report already in `memo`,
+    # and applies the deltas forward. Reports loaded together share a memo.
+    memo = {} if memo is None else memo
+    chain = []
+    while report.id not in memo and not report.is_snapshot:
+        chain.append(report)
+        report = db.session.get(Report, report.previous_report_id)
+    if report.id not in memo:
+        memo[report.id] = json.loads(read_report_blob(report.blob))
+    data = memo[report.id]
+    for later in reversed(chain):
+        data = apply_report_delta(data, json.loads(read_report_blob(later.blob)))
+        memo[later.id] = data
+    return data
+
+def history_fields(user_id, repository, data, content):
+    if repository is None:
+        return {}
+    previous = Report.query.filter_by(user_id=user_id, repository=repository) \
+        .order_by(Report.timestamp.desc(), Report.id.desc()).first()
+    fields = {'repository': repository, 'previous_report_id': previous.id if previous else None}
+    if previous is not None and previous.delta_depth + 1 < REPORT_SNAPSHOT_INTERVAL:
+        doc = json.dumps(report_delta(load_report_data(previous), data))
+        if len(doc) <= REPORT_DELTA_MAX_RATIO * len(content):
+            fields.update(is_snapshot=False, delta_depth=previous.delta_depth + 1, content=doc)
+    return fields
+
 # --- Report Routes ---
+# A saved report keeps its JSON in a report blob and is also broken down into
+# Finding and FunctionMetric rows, so the report queries below read only the
+# rows they need instead of loading and parsing whole reports.
+FINDING_FIELDS = {
+    'pylint': {
+        'file_path': 'path', 'line': 'line', 'symbol': 'symbol', 'message_id': 'message-id',
+        'severity': 'type', 'message': 'message',
+    },
+    'bandit': {
+        'file_path': 'filename', 'line': 'line_number', 'symbol': 'test_id',
+        'severity': 'issue_severity', 'confidence': 'issue_confidence', 'message': 'issue_text',
+    },
+}
+FINDING_COLUMNS = ('file_path', 'line', 'symbol', 'message_id', 'severity', 'confidence', 'message')
+METRIC_BLOCK_TYPES = ('function', 'method', 'class')
+METRIC_FIELDS = {
+    'file_path': 'file_path', 'kind': 'type', 'name': 'name', 'classname': 'classname',
+    'line': 'lineno', 'complexity': 'complexity', 'rank': 'rank',
+}
+METRIC_REQUIRED_COLUMNS = ('file_path', 'kind', 'name', 'complexity', 'rank')
+REPORT_INTEGER_COLUMNS = ('line', 'complexity')
+
+# Finding counts kept on the report row, by tool and severity.
+REPORT_SUMMARY_COLUMNS = {
+    ('pylint', 'fatal'): 'pylint_errors',
+    ('pylint', 'error'): 'pylint_errors',
+    ('pylint', 'warning'): 'pylint_warnings',
+    ('pylint', 'refactor'): 'pylint_refactors',
+    ('pylint', 'convention'): 'pylint_conventions',
+    ('bandit', 'HIGH'): 'bandit_high',
+    ('bandit', 'MEDIUM'): 'bandit_medium',
+    ('bandit', 'LOW'): 'bandit_low',
+}
+REPORT_PAGE_SIZE = 20
+REPORT_MAX_PAGE_SIZE = 100
+
+def report_column(column, value):
+    # Reports come from the client as JSON: a column takes a string or, for
+    # the integer columns, a whole number (or its digits); anything else is
+    # refused rather than handed to the database.
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid {column} in the report.")
+    if column in REPORT_INTEGER_COLUMNS:
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, int) or (isinstance(value, str) and value.strip().lstrip('-').isdigit()):
+            return int(value)
+    elif isinstance(value, str):
+        return value
+    elif isinstance(value, (int, float)):
+        return str(value)
+    raise ValueError(f"Invalid {column} in the report.")
+
+def report_items(data, tool):
+    items = data.get(tool)
+    if items is None:
+        return []
+    if not isinstance(items, list):
+        raise ValueError(f"Invalid {tool} results in the report.")
+    return [item for item in items if isinstance(item, dict)]
+
+def report_rows(data):
+    # Raises ValueError for a malformed report. Findings without a file and
+    # blocks missing a required field are left out.
+    findings = []
+    for tool, fields in FINDING_FIELDS.items():
+        for item in report_items(data, tool):
+            row = dict.fromkeys(FINDING_COLUMNS)
+            row.update({column: report_column(column, item.get(key)) for column, key in fields.items()})
+            # Placeholders for failed runs name no file.
+            if row['file_path'] is None:
+                continue
+            row['tool'] = tool
+            findings.append(row)
+    metrics = []
+    for block in report_items(data, 'radon'):
+        if block.get('type') not in METRIC_BLOCK_TYPES:
+            continue
+        row = {column: report_column(column, block.get(key)) for column, key in METRIC_FIELDS.items()}
+        if all(row[column] is not None for column in METRIC_REQUIRED_COLUMNS):
+            metrics.append(row)
+    return findings, metrics
+
+def report_summary(findings, metrics):
+    summary = dict.fromkeys(set(REPORT_SUMMARY_COLUMNS.values()), 0)
+    for finding in findings:
+        column = REPORT_SUMMARY_COLUMNS.get((finding['tool'], finding['severity']))
+        if column is not None:
+            summary[column] += 1
+    summary['max_complexity'] = max((metric['complexity'] for metric in metrics), default=None)
+    return summary
+
+def serialize_report_summary(report):
+    return {
+        "id": report.id,
+        "timestamp": report.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+        "pylint": {
+            "error": report.pylint_errors,
+            "warning": report.pylint_warnings,
+            "refactor": report.pylint_refactors,
+            "convention": report.pylint_conventions,
+        },
+        "bandit": {"HIGH": report.bandit_high, "MEDIUM": report.bandit_medium, "LOW": report.bandit_low},
+        "max_complexity": report.max_complexity,
+    }
+
+
+def serialize_finding(finding):
+    return {
+        "id": finding.id,
+        "tool": finding.tool,
+        "file_path": finding.file_path,
+        "line": finding.line,
+        "symbol": finding.symbol,
+        "message_id": finding.message_id,
+        "severity": finding.severity,
+        "confidence": finding.confidence,
+        "message": finding.message,
+    }
+
+def serialize_function_metric(metric):
+    return {
+        "id": metric.id,
+        "file_path": metric.file_path,
+        "type": metric.kind,
+        "name": metric.name,
+        "classname": metric.classname,
+        "lineno": metric.line,
+        "complexity": metric.complexity,
+        "rank": metric.rank,
+    }
+
+# A finding is matched across reports by its tool, file, symbol and a snippet
+# with line numbers taken out, so findings that only moved still match. For
+# bandit the snippet is the flagged source lines; pylint reports no source, so
+# its snippet is the enclosing object and the message.
+SNIPPET_SOURCE_LINE = re.compile(r'^(\d+) ?(.*)$')
+SNIPPET_LINE_REFERENCE = re.compile(r'\bline \d+')
+
+def finding_snippet(tool, item):
+    if tool == 'bandit':
+        # Saved reports are client JSON: fields the report rows do not keep
+        # may hold anything.
+        line_range, code = item.get('line_range'), item.get('code')
+        flagged = set(line_range) if isinstance(line_range, list) else set()
+        lines = [SNIPPET_SOURCE_LINE.match(line) for line in (code if isinstance(code, str) else '').splitlines()]
+        lines = [match.group(2) for match in lines if match and int(match.group(1)) in flagged] \
+            or [match.group(2) for match in lines if match]
+        text = ' '.join(lines)
+    else:
+        text = f"{item.get('obj') or ''}: {SNIPPET_LINE_REFERENCE.sub('line', str(item.get('message') or ''))}"
+    return ' '.join(text.split())
+
+def report_fingerprints(data):
+    fingerprinted = []
+    for tool, fields in FINDING_FIELDS.items():
+        for item in data.get(tool) or []:
+            if not isinstance(item, dict) or not item.get(fields['file_path']):
+                continue
+            fingerprint = (tool, item[fields['file_path']], item.get(fields['symbol']), finding_snippet(tool, item))
+            fingerprinted.append((fingerprint, tool, item))
+    return fingerprinted
+
+def unmatched_findings(fingerprinted, matched):
+    remaining = matched.copy()
+    findings = []
+    for fingerprint, tool, item in fingerprinted:
+        if remaining[fingerprint]:
+            remaining[fingerprint] -= 1
+            continue
+        finding = {column: item.get(key) for column, key in FINDING_FIELDS[tool].items()}
+        finding['tool'] = tool
+        findings.append(finding)
+    return findings
+
+def owns_report(report_id):
+    return db.session.query(Report.id).filter_by(id=report_id, user_id=current_user.id).first() is not None
+
 @app.route('/save-report', methods=['POST'])
 @login_required
 def save_report():
     data = request.get_json()
-    new_report = Report(content=json.dumps(data), author=current_user)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Invalid report."}), 400
+    try:
+        findings, metrics = report_rows(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    content = json.dumps(data)
+    repository = data['repo'] if isinstance(data.get('repo'), str) else None
+    history = history_fields(current_user.id, repository, data, content)
+    blob_digest = store_report_blob(history.pop('content', content))
+    new_report = Report(blob_digest=blob_digest, author=current_user, **history, **report_summary(findings, metrics))
     db.session.add(new_report)
+    db.session.flush()
+    for row in findings + metrics:
+        row.update(report_id=new_report.id, user_id=current_user.id)
+    if findings:
+        db.session.execute(db.insert(Finding), findings)
+    if metrics:
+        db.session.execute(db.insert(FunctionMetric), metrics)
     db.session.commit()
     return jsonify({"message": "Report saved", "report_id": new_report.id}), 201
 
+@app.route('/reports', methods=['GET'])
+@login_required
+def list_reports():
+    # Newest first, paged by the (timestamp, id) of the report the previous
+    # page ended on, so every page is one index range scan however long the
+    # history is. Only summary columns are read. The cursor is that report's
+    # id and its timestamp is compared as stored: SQLite keeps
+    # CURRENT_TIMESTAMP as text without microseconds, which a bound datetime
+    # would not match.
+    limit = min(max(request.args.get('limit', REPORT_PAGE_SIZE, type=int), 1), REPORT_MAX_PAGE_SIZE)
+    query = Report.query.options(db.load_only(
+        Report.id, Report.timestamp, Report.max_complexity, *(getattr(Report, column) for column in set(REPORT_SUMMARY_COLUMNS.values()))
+    )).filter_by(user_id=current_user.id)
+    if 'cursor' in request.args:
+        cursor = request.args.get('cursor', type=int)
+        if cursor is None:
+            return jsonify({"error": "Invalid cursor."}), 400
+        position = db.select(Report.timestamp).where(Report.id == cursor, Report.user_id == current_user.id).scalar_subquery()
+        query = query.filter(db.tuple_(Report.timestamp, Report.id) < db.tuple_(position, cursor))
+    reports = query.order_by(Report.timestamp.desc(), Report.id.desc()).limit(limit + 1).all()
+    return jsonify({
+        "reports": [serialize_report_summary(report) for report in reports[:limit]],
+        "next_cursor": reports[limit - 1].id if len(reports) > limit else None,
+    }), 200
+
+@app.route('/reports/<int:report_id>/changes', methods=['GET'])
+@login_required
+def get_report_changes(report_id):
+    # Findings added and removed since the previous report of the same
+    # repository. A delta already holds them; a snapshot is compared with the
+    # previous report, and a report with none counts everything as added.
+    report = Report.query.filter_by(id=report_id, user_id=current_user.id).first()
+    if report is None:
+        return jsonify({"error": "Report not found"}), 404
+    if report.is_snapshot:
+        previous = db.session.get(Report, report.previous_report_id) if report.previous_report_id else None
+        doc = report_delta(load_report_data(previous) if previous else {}, load_report_data(report))
+    else:
+        doc = json.loads(read_report_blob(report.blob))
+    return jsonify({
+        "report_id": report.id,
+        "repository": report.repository,
+        "previous_report_id": report.previous_report_id,
+        **delta_changes(doc),
+    }), 200
+
+@app.route('/reports/<int:base_id>/diff/<int:report_id>', methods=['GET'])
+@login_required
+def diff_reports(base_id, report_id):
+    # Findings of `report_id` missing from `base_id` are new, the reverse are
+    # fixed. Fingerprints are counted, so duplicates are matched one for one.
+    reports = {report.id: report for report in Report.query.filter(
+        Report.id.in_((base_id, report_id)), Report.user_id == current_user.id
+    ).all()}
+    if base_id not in reports or report_id not in reports:
+        return jsonify({"error": "Report not found"}), 404
+    memo = {}
+    base = report_fingerprints(load_report_data(reports[base_id], memo))
+    current = report_fingerprints(load_report_data(reports[report_id], memo))
+    base_counts = Counter(fingerprint for fingerprint, _, _ in base)
+    current_counts = Counter(fingerprint for fingerprint, _, _ in current)
+    unchanged = base_counts & current_counts
+    new_findings = unmatched_findings(current, unchanged)
+    fixed_findings = unmatched_findings(base, unchanged)
+    return jsonify({
+        "base_report_id": base_id,
+        "report_id": report_id,
+        "new": len(new_findings),
+        "fixed": len(fixed_findings),
+        "unchanged": sum(unchanged.values()),
+        "new_findings": new_findings,
+        "fixed_findings": fixed_findings,
+    }), 200
+
+@app.route('/reports/<int:report_id>/findings', methods=['GET'])
+@login_required
+def get_report_findings(report_id):
+    if not owns_report(report_id):
+        return jsonify({"error": "Report not found"}), 404
+    query = Finding.query.filter_by(report_id=report_id)
+    for column in ('tool', 'symbol', 'severity', 'file_path'):
+        if request.args.get(column):
+            query = query.filter(getattr(Finding, column) == request.args[column])
+    findings = query.order_by(Finding.file_path, Finding.line, Finding.id).all()
+    return jsonify([serialize_finding(finding) for finding in findings]), 200
+
+@app.route('/reports/<int:report_id>/metrics', methods=['GET'])
+@login_required
+def get_report_metrics(report_id):
+    if not owns_report(report_id):
+        return jsonify({"error": "Report not found"}), 404
+    query = FunctionMetric.query.filter_by(report_id=report_id)
+    min_complexity = request.args.get('min_complexity', type=int)
+    if min_complexity is not None:
+        query = query.filter(FunctionMetric.complexity >= min_complexity)
+    limit = request.args.get('limit', type=int)
+    metrics = query.order_by(FunctionMetric.complexity.desc(), FunctionMetric.id).limit(limit).all()
+    return jsonify([serialize_function_metric(metric) for metric in metrics]), 200
+
+@app.route('/findings/summary', methods=['GET'])
+@login_required
+def get_findings_summary():
+    # Finding counts per tool and symbol across all of the user's reports.
+    count = db.func.count(Finding.id)
+    query = db.session.query(Finding.tool, Finding.symbol, count, db.func.count(db.distinct(Finding.report_id))) \
+        .filter(Finding.user_id == current_user.id)
+    if request.args.get('tool'):
+        query = query.filter(Finding.tool == request.args['tool'])
+    rows = query.group_by(Finding.tool, Finding.symbol).order_by(count.desc(), Finding.tool, Finding.symbol).all()
+    return jsonify([
+        {"tool": tool, "symbol": symbol, "count": total, "reports": reports}
+        for tool, symbol, total, reports in rows
+    ]), 200
+
 @app.route('/get-reports', methods=['GET'])
 @login_required
 def get_reports():
-    reports = Report.query.filter_by(user_id=current_user.id).order_by(Report.timestamp.desc()).all()
+    reports = Report.query.options(db.joinedload(Report.blob)) \
+        .filter_by(user_id=current_user.id).order_by(Report.timestamp.desc()).all()
+    memo = {}
     return jsonify([
         {
             "id": r.id,
             "timestamp": r.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            "content": json.loads(r.content)
+            "content": load_report_data(r, memo)
         } for r in reports
     ]), 200
 
+# --- Analyzer Pool Warm-up ---
+# The warmed modules are moved out of the collector's reach: a full
+# collection would otherwise walk all of them, and touching their pages
+# would copy them into every forked worker.
+warm_analyzer_modules(ANALYZER_WARMUP_MODULES)
+gc.freeze()
+get_analyzer_pool()
+
+# --- Embedded Job Workers ---
+# Jobs left queued by a previous process are picked up as soon as this one
+# starts, not when the next job is submitted. Flask CLI commands load the app
+# as well (migrations, `flask analysis-worker`) and leave the queue alone;
+# `flask run` starts its workers with the first job instead.
+if ANALYSIS_EMBEDDED_JOB_WORKERS and not os.environ.get('FLASK_RUN_FROM_CLI'):
+    start_embedded_job_workers()
+
 # --- Run Locally ---
 if __name__ == '__main__':
     with app.app_context():
@@ -0,0 +1,98 @@
+import os
+import sys
+import json
+import glob
+import uuid
+import tempfile
+import statistics
+import time
+
+# The benchmarks must not pick up the app's queued analysis jobs, nor
+# findings the app has cached.
+os.environ.setdefault('ANALYSIS_EMBEDDED_JOB_WORKERS', '0')
+os.environ.setdefault('ANALYSIS_CACHE_PATH', os.path.join(tempfile.mkdtemp(), 'analysis_cache.db'))
+
+import backend
+
+# Checks the 'fast' profile's latency target: an /analyze upload at the
+# request limits (20 files of up to 10,000 characters) answers within 2
+# seconds on a warm pool. The files are cut from the uploaded fixtures at
+# top-level statements. Every request changes a comment in each file, as a
+# user editing and re-submitting would, so nothing is served from the cache.
+# Exits non-zero when a timed request misses the target.
+# Usage: python bench_fast_profile.py [requests] > bench_fast_profile_output.txt
+UPLOADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp_uploads')
+REQUEST_MAX_FILES = 20
+REQUEST_MAX_FILE_CHARS = 10000
+TARGET_SECONDS = 2.0
+
+
+def fixture_chunks():
+    # Leave room for the comment each request appends.
+    limit = REQUEST_MAX_FILE_CHARS - 100
+    chunks = []
+    for path in sorted(glob.glob(os.path.join(UPLOADS_DIR, '*.py'))):
+        with open(path, encoding='utf-8') as f:
+            lines = backend.normalize_source(f.read()).splitlines(keepends=True)
+        blocks = []
+        for line in lines:
+            if not blocks or line[:1].strip():
+                blocks.append('')
+            blocks[-1] += line
+        chunk = ''
+        for block in blocks:
+            if len(chunk) + len(block) > limit and chunk:
+                chunks.append(chunk)
+                chunk = ''
+            # A top-level block over the limit on its own is cut by lines.
+            while len(block) > limit:
+                cut = block.rfind('\n', 0, limit) + 1 or limit
+                chunks.append(block[:cut])
+                block = block[cut:]
+            chunk += block
+        if chunk:
+            chunks.append(chunk)
+    return [
+        {'fileName': f'upload_{index}.py', 'content': chunks[index % len(chunks)]}
+        for index in range(REQUEST_MAX_FILES)
+    ]
+
+
+def timed_request(client, files, revision):
+    body = [dict(file_info, content=f"{file_info['content']}\n# revision {revision} {uuid.uuid4().hex}\n") for file_info in files]
+    start = time.perf_counter()
+    response = client.post('/analyze?mode=sync&profile=fast', json=body)
+    return time.perf_counter() - start, response
+
+
+def main():
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    files = fixture_chunks()
+    client = backend.app.test_client()
+    try:
+        # The first request only warms the pool's task processes.
+        warmup_seconds, _ = timed_request(client, files, 'warmup')
+        latencies, statuses = [], []
+        for revision in range(requests_count):
+            elapsed, response = timed_request(client, files, revision)
+            latencies.append(elapsed)
+            statuses.append(response.get_json()['status'])
+        report = {
+            'files': len(files),
+            'bytes': sum(len(file_info['content']) for file_info in files),
+            'requests': requests_count,
+            'warmup_s': round(warmup_seconds, 3),
+            'median_s': round(statistics.median(latencies), 3),
+            'max_s': round(max(latencies), 3),
+            'incomplete': [status for status in statuses if set(status.values()) != {'complete'}],
+            'target_s': TARGET_SECONDS,
+        }
+        report['meets_target'] = report['max_s'] <= TARGET_SECONDS and not report['incomplete']
+        print(json.dumps(report, indent=2))
+    finally:
+        backend.get_analyzer_pool().terminate()
+    sys.exit(0 if report['meets_target'] else 1)
+
+
+if __name__ == '__main__':
+    main()
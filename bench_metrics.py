@@ -0,0 +1,155 @@
+import os
+import ast
+import sys
+import json
+import glob
+import shutil
+import tempfile
+import statistics
+import subprocess
+import time
+
+from radon.complexity import cc_visit
+from radon.metrics import h_visit, mi_visit
+from radon.raw import analyze
+
+# The benchmarks must not pick up the app's queued analysis jobs.
+os.environ.setdefault('ANALYSIS_EMBEDDED_JOB_WORKERS', '0')
+
+import backend
+
+# Compares the in-process metrics engine with the radon CLI it replaces, and
+# with radon's own APIs computing the same four metrics, on the uploaded
+# fixtures and on a module the size of temp_uploads/admin_bp.py.
+# Usage: python bench_metrics.py [repeats] > bench_output.txt
+UPLOADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp_uploads')
+REFERENCE_FILE = os.path.join(UPLOADS_DIR, 'admin_bp.py')
+RADON_COMMANDS = ['cc', 'mi', 'raw', 'hal']
+
+
+def parsable_fixtures():
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(UPLOADS_DIR, '*.py'))):
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+        try:
+            compile(source, path, 'exec', dont_inherit=True)
+        except SyntaxError:
+            continue
+        fixtures[os.path.basename(path)] = source
+    return fixtures
+
+
+def reference_sized_module(fixtures):
+    # admin_bp.py itself does not parse, so a module of the same length is
+    # assembled from the fixtures that do.
+    with open(REFERENCE_FILE, encoding='utf-8') as f:
+        target_lines = len(f.read().splitlines())
+    lines = []
+    while len(lines) < target_lines:
+        for source in fixtures.values():
+            source_lines = source.splitlines()
+            # Cut only between top-level statements so the module still parses.
+            for node in ast.parse(source).body:
+                if len(lines) + node.end_lineno > target_lines:
+                    source_lines = source_lines[:node.lineno - 1]
+                    break
+            lines.extend(source_lines)
+            if len(lines) >= target_lines or len(source_lines) < len(source.splitlines()):
+                return '\n'.join(lines) + '\n'
+    return '\n'.join(lines) + '\n'
+
+
+def time_call(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def radon_subprocess(path, commands):
+    for command in commands:
+        subprocess.run(['radon', command, '-j', path], check=True, capture_output=True)
+
+
+def radon_api(source):
+    cc_visit(source)
+    mi_visit(source, True)
+    analyze(source)
+    h_visit(source)
+
+
+def engine(path):
+    with open(path, encoding='utf-8') as f:
+        return backend.measure_artifacts(backend.build_artifacts(path, f.read()))
+
+
+def parity(source, path):
+    blocks = engine(path)
+    module = blocks.pop()
+    ours = sorted((b['type'], b.get('classname'), b['name'], b['lineno'], b['complexity'], b['rank']) for b in blocks)
+    theirs = sorted(
+        ('method' if getattr(b, 'is_method', False) else 'function' if hasattr(b, 'is_method') else 'class',
+         getattr(b, 'classname', None), b.name, b.lineno, b.complexity, backend.complexity_rank(b.complexity))
+        for b in cc_visit(source)
+    )
+    radon_raw = analyze(source)._asdict()
+    radon_halstead = h_visit(source).total._asdict()
+    return {
+        'blocks': len(ours),
+        'cc_match': ours == theirs,
+        'raw_match': module['raw'] == radon_raw,
+        'halstead_match': module['halstead'] == {
+            'h1': radon_halstead['h1'], 'h2': radon_halstead['h2'],
+            'N1': radon_halstead['N1'], 'N2': radon_halstead['N2'],
+            'vocabulary': radon_halstead['vocabulary'], 'length': radon_halstead['length'],
+            'calculated_length': radon_halstead['calculated_length'], 'volume': radon_halstead['volume'],
+            'difficulty': radon_halstead['difficulty'], 'effort': radon_halstead['effort'],
+            'time': radon_halstead['time'], 'bugs': radon_halstead['bugs'],
+        },
+        'mi_delta': abs(module['mi'] - mi_visit(source, True)),
+    }
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    if shutil.which('radon') is None:
+        sys.exit('the radon CLI is required for the comparison')
+
+    fixtures = parsable_fixtures()
+    inputs = dict(fixtures)
+    inputs['admin_bp_sized.py'] = reference_sized_module(fixtures)
+
+    workdir = tempfile.mkdtemp()
+    try:
+        report = []
+        for name, source in inputs.items():
+            path = os.path.join(workdir, name)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(source)
+            cc_only = time_call(lambda: radon_subprocess(path, ['cc']), repeats)
+            all_metrics = time_call(lambda: radon_subprocess(path, RADON_COMMANDS), repeats)
+            api = time_call(lambda: radon_api(source), repeats)
+            in_process = time_call(lambda: engine(path), repeats)
+            report.append({
+                'file': name,
+                'lines': len(source.splitlines()),
+                'radon_cc_subprocess_s': round(cc_only, 4),
+                'radon_cc_mi_raw_hal_subprocess_s': round(all_metrics, 4),
+                'radon_api_all_s': round(api, 4),
+                'engine_s': round(in_process, 4),
+                'speedup_vs_cc': round(cc_only / in_process, 1),
+                'speedup_vs_all': round(all_metrics / in_process, 1),
+                'speedup_vs_api': round(api / in_process, 1),
+                **parity(source, path),
+            })
+        print(json.dumps(report, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        backend.get_analyzer_pool().terminate()
+
+
+if __name__ == '__main__':
+    main()
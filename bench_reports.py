@@ -0,0 +1,141 @@
+import os
+import sys
+import json
+import glob
+import random
+import sqlite3
+import hashlib
+import tempfile
+import statistics
+import shutil
+import time
+
+# The benchmarks must not pick up the app's queued analysis jobs.
+os.environ.setdefault('ANALYSIS_EMBEDDED_JOB_WORKERS', '0')
+
+import backend
+
+# Compares saved-report storage as compressed, content-addressed blobs with the
+# plain JSON text column it replaces: database size on disk and median
+# write/read latency per report. The payload is a real analysis of the
+# uploaded fixtures. Two histories are saved: 'resaved' repeats one payload,
+# 'reanalyzed' gives each report its own timings and moves a finding now and
+# then, as consecutive analyses of the same code do.
+# Usage: python bench_reports.py [reports] > bench_reports_output.txt
+UPLOADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp_uploads')
+
+
+def fixture_payload():
+    files = []
+    for path in sorted(glob.glob(os.path.join(UPLOADS_DIR, '*.py'))):
+        with open(path, encoding='utf-8') as f:
+            files.append({'fileName': os.path.basename(path), 'content': f.read()})
+    return backend.analyze_files(files)
+
+
+def history(payload, count, kind):
+    rng = random.Random(0)
+    for index in range(count):
+        if kind == 'resaved':
+            yield json.dumps(payload)
+            continue
+        report = json.loads(json.dumps(payload))
+        report['timings'] = {tool: round(rng.uniform(0.05, 3.0), 3) for tool in report['timings']}
+        if index % 5 == 0 and report.get('pylint'):
+            report['pylint'][rng.randrange(len(report['pylint']))]['line'] += 1
+            payload = report
+        yield json.dumps(report)
+
+
+def text_store(path):
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE report (id INTEGER PRIMARY KEY, content TEXT NOT NULL)')
+
+    def write(content):
+        cursor = conn.execute('INSERT INTO report (content) VALUES (?)', (content,))
+        conn.commit()
+        return cursor.lastrowid
+
+    def read(report_id):
+        return json.loads(conn.execute('SELECT content FROM report WHERE id = ?', (report_id,)).fetchone()[0])
+
+    return conn, write, read
+
+
+def blob_store(path, codec):
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE report_blob (digest TEXT PRIMARY KEY, codec TEXT NOT NULL, size INTEGER NOT NULL, data BLOB NOT NULL)')
+    conn.execute('CREATE TABLE report (id INTEGER PRIMARY KEY, blob_digest TEXT NOT NULL REFERENCES report_blob (digest))')
+
+    def write(content):
+        raw = content.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        if conn.execute('SELECT 1 FROM report_blob WHERE digest = ?', (digest,)).fetchone() is None:
+            conn.execute(
+                'INSERT INTO report_blob (digest, codec, size, data) VALUES (?, ?, ?, ?)',
+                (digest, codec, len(raw), backend.compress_report_blob(raw, codec))
+            )
+        cursor = conn.execute('INSERT INTO report (blob_digest) VALUES (?)', (digest,))
+        conn.commit()
+        return cursor.lastrowid
+
+    def read(report_id):
+        codec, data = conn.execute(
+            'SELECT b.codec, b.data FROM report r JOIN report_blob b ON b.digest = r.blob_digest WHERE r.id = ?',
+            (report_id,)
+        ).fetchone()
+        return json.loads(backend.decompress_report_blob(codec, data))
+
+    return conn, write, read
+
+
+def measure(store, path, contents):
+    conn, write, read = store(path)
+    write_timings, ids = [], []
+    for content in contents:
+        start = time.perf_counter()
+        ids.append(write(content))
+        write_timings.append(time.perf_counter() - start)
+    read_timings = []
+    for report_id in ids:
+        start = time.perf_counter()
+        read(report_id)
+        read_timings.append(time.perf_counter() - start)
+    conn.execute('VACUUM')
+    conn.close()
+    return {
+        'db_bytes': os.path.getsize(path),
+        'write_ms': round(statistics.median(write_timings) * 1000, 3),
+        'read_ms': round(statistics.median(read_timings) * 1000, 3),
+    }
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    codecs = ['zlib'] + (['zstd'] if backend.zstandard else [])
+    workdir = tempfile.mkdtemp()
+    try:
+        payload = fixture_payload()
+        report = []
+        for kind in ('resaved', 'reanalyzed'):
+            contents = list(history(payload, count, kind))
+            stores = {'text': text_store}
+            stores.update({f'blob_{codec}': (lambda path, codec=codec: blob_store(path, codec)) for codec in codecs})
+            results = {name: measure(store, os.path.join(workdir, f'{kind}_{name}.db'), contents) for name, store in stores.items()}
+            for name in stores:
+                results[name]['size_ratio'] = round(results['text']['db_bytes'] / results[name]['db_bytes'], 1)
+            report.append({
+                'history': kind,
+                'reports': count,
+                'payload_bytes': len(contents[0]),
+                'distinct_payloads': len(set(contents)),
+                **results,
+            })
+        print(json.dumps(report, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        backend.get_analyzer_pool().terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -66,7 +66,9 @@ const App = () => {
     const DashboardPage = () => {
         const [repos, setRepos] = useState([]);
         const [selectedRepo, setSelectedRepo] = useState('');
+        const [profile, setProfile] = useState('fast');
         const [analysisResults, setAnalysisResults] = useState(null);
+        const [analysisError, setAnalysisError] = useState('');
         const [isLoading, setIsLoading] = useState(false);
         const [isReposLoading, setIsReposLoading] = useState(true);
 
@@ -79,18 +81,57 @@ const App = () => {
                 .finally(() => setIsReposLoading(false));
         }, []);
 
+        // The stream carries one NDJSON event per line; each tool's section
+        // renders as soon as its 'result' event arrives. A stream ends with a
+        // 'done' event, or with an 'error' event when the analysis failed.
+        const readAnalysisStream = (res) => {
+            const reader = res.body.getReader();
+            const decoder = new TextDecoder();
+            let buffered = '';
+            let finished = false;
+            const handleLine = (line) => {
+                if (!line.trim()) return;
+                const event = JSON.parse(line);
+                if (event.event === 'result') {
+                    setAnalysisResults(prev => ({ ...prev, [event.tool]: event.findings }));
+                } else if (event.event === 'error') {
+                    finished = true;
+                    setAnalysisError(event.error);
+                } else if (event.event === 'done') {
+                    finished = true;
+                }
+            };
+            const read = () => reader.read().then(({ done, value }) => {
+                if (done) {
+                    handleLine(buffered);
+                    if (!finished) setAnalysisError('The analysis stopped before it finished. Please try again.');
+                    return;
+                }
+                buffered += decoder.decode(value, { stream: true });
+                const lines = buffered.split('\n');
+                buffered = lines.pop();
+                lines.forEach(handleLine);
+                return read();
+            });
+            return read();
+        };
+
         const handleAnalyzeClick = () => {
             if (!selectedRepo) return;
             setIsLoading(true);
             setAnalysisResults(null);
-            fetch(`${API_URL}/analyze`, {
+            setAnalysisError('');
+            fetch(`${API_URL}/analyze?mode=stream&profile=${profile}`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ repoName: selectedRepo }),
                 credentials: 'include'
             })
-            .then(res => res.json())
-            .then(data => setAnalysisResults(data))
+            .then(res => res.ok && res.body ? readAnalysisStream(res) : res.json().then(data => {
+                if (data.error) setAnalysisError(data.error);
+                else setAnalysisResults(data);
+            }))
+            .catch(() => setAnalysisError('The analysis could not be completed. Please try again.'))
             .finally(() => setIsLoading(false));
         };
 
@@ -106,6 +147,11 @@ const App = () => {
                                 <option value="">-- Select a Repository --</option>
                                 {repos.map(repo => <option key={repo.name} value={repo.name}>{repo.name}</option>)}
                             </select>
+                            <select value={profile} onChange={e => setProfile(e.target.value)} className="p-3 border rounded-lg bg-gray-50">
+                                <option value="fast">Fast check</option>
+                                <option value="standard">Standard</option>
+                                <option value="full">Full audit</option>
+                            </select>
                             <button onClick={handleAnalyzeClick} disabled={isLoading || !selectedRepo} className="bg-indigo-600 text-white p-3 rounded-lg hover:bg-indigo-700 disabled:bg-indigo-300 whitespace-nowrap font-semibold">
                                 {isLoading ? 'Analyzing...' : 'Analyze Repo'}
                             </button>
@@ -113,6 +159,8 @@ const App = () => {
                     )}
                 </div>
 
+                {analysisError && <p className="bg-red-100 text-red-700 p-3 rounded mt-8">{analysisError}</p>}
+
                 {isLoading && <div className="text-center p-8"><div className="w-16 h-16 border-4 border-dashed rounded-full animate-spin border-indigo-600 mx-auto"></div><p className="text-gray-600 mt-4">Cloning repository and running analysis...</p></div>}
 
                 {analysisResults && (
@@ -200,7 +248,8 @@ const BanditReport = ({ banditData }) => {
 
 const RadonReport = ({ radonData }) => {
     if (!radonData || radonData.length === 0) return null;
-    const sortedFunctions = [...radonData].sort((a, b) => b.complexity - a.complexity);
+    const sortedFunctions = radonData.filter(block => block.type !== 'module').sort((a, b) => b.complexity - a.complexity);
+    const modules = radonData.filter(block => block.type === 'module');
     const getRankStyling = (rank) => ({'A': 'bg-green-500 text-white', 'B': 'bg-blue-500 text-white', 'C': 'bg-yellow-500 text-black', 'D': 'bg-orange-500 text-white', 'E': 'bg-red-500 text-white', 'F': 'bg-red-700 text-white'}[rank] || 'bg-gray-400');
     return (
          <div className="bg-white p-6 rounded-xl shadow-lg">
@@ -215,6 +264,19 @@ const RadonReport = ({ radonData }) => {
                     </tbody>
                 </table>
             </div>
+            {modules.length > 0 && (
+                <div className="overflow-x-auto mt-6">
+                    <h3 className="text-lg font-semibold text-gray-800 mb-2">Maintainability</h3>
+                    <table className="min-w-full divide-y divide-gray-200">
+                        <thead className="bg-gray-50"><tr><th scope="col" className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">File</th><th scope="col" className="px-6 py-3 text-center text-xs font-medium text-gray-500 uppercase tracking-wider">MI</th><th scope="col" className="px-6 py-3 text-center text-xs font-medium text-gray-500 uppercase tracking-wider">SLOC</th><th scope="col" className="px-6 py-3 text-center text-xs font-medium text-gray-500 uppercase tracking-wider">Comments</th><th scope="col" className="px-6 py-3 text-center text-xs font-medium text-gray-500 uppercase tracking-wider">Halstead Volume</th></tr></thead>
+                        <tbody className="bg-white divide-y divide-gray-200">
+                            {modules.map((module, index) => (
+                                <tr key={index}><td className="px-6 py-4 whitespace-nowrap"><span className="text-sm text-gray-500">{module.file_path}</span></td><td className="px-6 py-4 text-center"><span className={`px-3 py-1 text-xs font-bold rounded-full ${getRankStyling(module.mi_rank)}`}>{module.mi.toFixed(1)}</span></td><td className="px-6 py-4 text-center text-sm text-gray-900">{module.raw.sloc}</td><td className="px-6 py-4 text-center text-sm text-gray-900">{module.raw.comments}</td><td className="px-6 py-4 text-center text-sm text-gray-900">{Math.round(module.halstead.volume)}</td></tr>
+                            ))}
+                        </tbody>
+                    </table>
+                </div>
+            )}
         </div>
     );
 };
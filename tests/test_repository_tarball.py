@@ -0,0 +1,126 @@
+import io
+import os
+import sys
+import shutil
+import tarfile
+import tempfile
+import threading
+import importlib
+import unittest
+import http.server
+
+# Tarball ingestion against a local stand-in for the GitHub API: the commit
+# and tarball endpoints are served by http.server, and backend is imported
+# with GITHUB_API_URL pointing at it.
+# Usage: python -m pytest tests  (or python -m unittest discover tests)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REPO_NAME = 'org/proj'
+COMMIT_SHA = '3f2a9c1d5e7b8a4f6c0d2e1b9a8c7d6e5f4a3b2c'
+ARCHIVE_PREFIX = f"org-proj-{COMMIT_SHA[:7]}"
+MEMBERS = {
+    'pkg/__init__.py': '"""Package."""\n',
+    'pkg/core.py': '"""Core."""\nimport subprocess\n\n\ndef run(command):\n    """Run."""\n    return subprocess.call(command, shell=True)\n',
+    'setup.py': '"""Setup."""\n',
+    'README.md': '# proj\n',
+}
+
+
+def fixture_tarball():
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        directory = tarfile.TarInfo(ARCHIVE_PREFIX)
+        directory.type = tarfile.DIRTYPE
+        archive.addfile(directory)
+        for name, content in MEMBERS.items():
+            data = content.encode('utf-8')
+            member = tarfile.TarInfo(f"{ARCHIVE_PREFIX}/{name}")
+            member.size = len(data)
+            archive.addfile(member, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+class StandInGitHub(http.server.BaseHTTPRequestHandler):
+    tarball = fixture_tarball()
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append(self.path)
+        if self.path == f"/repos/{REPO_NAME}/commits/HEAD":
+            body = COMMIT_SHA.encode()
+        elif self.path == f"/repos/{REPO_NAME}/tarball/{COMMIT_SHA}":
+            body = self.tarball
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+server = None
+workdir = None
+backend = None
+
+
+def setUpModule():
+    global server, workdir, backend
+    server = http.server.HTTPServer(('127.0.0.1', 0), StandInGitHub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    workdir = tempfile.mkdtemp()
+    os.environ['GITHUB_API_URL'] = f"http://127.0.0.1:{server.server_port}"
+    os.environ['ANALYSIS_CACHE_PATH'] = os.path.join(workdir, 'analysis_cache.db')
+    os.environ['ANALYSIS_EMBEDDED_JOB_WORKERS'] = '0'
+    backend = importlib.import_module('backend')
+
+
+def tearDownModule():
+    backend.get_analyzer_pool().terminate()
+    server.shutdown()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+class RepositoryTarballTest(unittest.TestCase):
+    def setUp(self):
+        StandInGitHub.requests_seen.clear()
+
+    def deadline(self):
+        return backend.time.monotonic() + backend.ANALYSIS_DEADLINE
+
+    def tarball_requests(self):
+        return [path for path in StandInGitHub.requests_seen if '/tarball/' in path]
+
+    def test_resolves_commit(self):
+        self.assertEqual(backend.resolve_tarball_commit(REPO_NAME, None, self.deadline()), COMMIT_SHA)
+
+    def test_reads_python_members_without_archive_prefix(self):
+        files = backend.fetch_repository_tarball(REPO_NAME, None, COMMIT_SHA, self.deadline())
+        self.assertEqual([file_info['fileName'] for file_info in files], ['pkg/__init__.py', 'pkg/core.py', 'setup.py'])
+        self.assertEqual(files[1]['content'], MEMBERS['pkg/core.py'])
+
+    def test_second_analysis_is_served_from_memo(self):
+        first = list(backend.iter_repository_analysis(REPO_NAME, None, 'tarball'))
+        fetch = next(event for event in first if event.get('stage') == 'fetch')
+        self.assertEqual(fetch['commit'], COMMIT_SHA)
+        self.assertEqual(first[-1]['status'], {tool: 'complete' for tool in backend.ANALYZERS})
+        self.assertFalse(first[-1]['memoized'])
+        self.assertEqual(len(self.tarball_requests()), 1)
+        findings = {event['tool']: event['findings'] for event in first if event['event'] == 'result'}
+        self.assertIn('pkg/core.py', {issue['filename'] for issue in findings['bandit']})
+
+        second = list(backend.iter_repository_analysis(REPO_NAME, None, 'tarball'))
+        self.assertTrue(second[-1]['memoized'])
+        self.assertEqual(second[-1]['unparsable'], first[-1]['unparsable'])
+        self.assertEqual(second[-1]['commit'], COMMIT_SHA)
+        self.assertEqual(len(self.tarball_requests()), 1)
+        self.assertFalse(any(event.get('stage') == 'fetch' for event in second))
+        self.assertEqual({event['tool']: event['findings'] for event in second if event['event'] == 'result'}, findings)
+
+
+if __name__ == '__main__':
+    unittest.main()